@@ -2,6 +2,8 @@
 Vercel Serverless Function: PDF Table → Excel
 Auto-routes to /api/pdf-convert
 Handles convert (POST), rate-limit check (GET), download (GET ?action=download&token=xxx)
+A POST with Accept: text/event-stream gets server-sent events while it converts:
+log, progress, preview, then done (the usual JSON body) or error.
 """
 from http.server import BaseHTTPRequestHandler
 import json, os, re, time, uuid, io, math
@@ -11,6 +13,7 @@ from urllib.parse import urlparse, parse_qs
 
 RATE_LIMIT = 3
 RATE_WINDOW = 3600
+SSE_TYPE = "text/event-stream"
 
 _rate_log = defaultdict(list)
 _file_store = {}
@@ -38,12 +41,19 @@ def _check_rate(ip):
 def _record(ip):
     _rate_log[ip].append(time.time())
 
-def extract_tables_from_pdf(pdf_bytes, pages_str="all"):
+def _previews(tables, first_id=1):
+    return [{"id": first_id+i, "cols": t["cols"], "rows": t["rows"][:6], "total_rows": t["total_rows"]}
+            for i, t in enumerate(tables)]
+
+def extract_tables_from_pdf(pdf_bytes, pages_str="all", on_event=None):
+    """on_event(name, data), if given, gets log entries, per-page progress and previews of the first 3 tables."""
     import pdfplumber
 
+    emit = on_event or (lambda name, data: None)
     logs = []
     def log(msg, level="info"):
-        logs.append({"msg": msg, "level": level, "time": datetime.now().strftime("%H:%M:%S")})
+        entry = {"msg": msg, "level": level, "time": datetime.now().strftime("%H:%M:%S")}
+        logs.append(entry); emit("log", entry)
 
     t0 = time.time()
     pdf = pdfplumber.open(io.BytesIO(pdf_bytes))
@@ -64,19 +74,24 @@ def extract_tables_from_pdf(pdf_bytes, pages_str="all"):
                 if 0 <= idx < total:
                     page_list.append(idx)
 
-    all_tables = []
-    for pi in page_list:
+    all_tables = []; total_rows = 0
+    emit("progress", {"pages_done": 0, "pages_total": len(page_list), "tables": 0, "rows": 0})
+    for done, pi in enumerate(page_list, 1):
         page = pdf.pages[pi]
         tables = page.extract_tables()
         if tables:
+            before = len(all_tables)
             for tbl in tables:
                 rows = [[str(c) if c else "" for c in row] for row in tbl if any(c for c in row)]
                 if len(rows) >= 2:
                     all_tables.append({"cols": rows[0], "rows": rows[1:], "total_rows": len(rows) - 1})
+                    total_rows += len(rows) - 1
             log(f"Page {pi+1}: {len(tables)} table(s)", "ok")
+            if before < 3 and len(all_tables) > before:
+                emit("preview", {"page": pi+1, "tables": _previews(all_tables[before:3], before+1)})
+        emit("progress", {"pages_done": done, "pages_total": len(page_list), "tables": len(all_tables), "rows": total_rows})
 
     elapsed = round(time.time() - t0, 2)
-    total_rows = sum(t["total_rows"] for t in all_tables)
     log(f"Done — {len(all_tables)} tables, {total_rows} rows in {elapsed}s", "ok")
     stats = {"tables": len(all_tables), "rows": total_rows, "pages": len(page_list), "time": elapsed}
     pdf.close()
@@ -221,7 +236,14 @@ class handler(BaseHTTPRequestHandler):
             if len(pdf_bytes) > 100 * 1024 * 1024:
                 self._json(400, {"error": "File too large (max 100MB)"}); return
 
-            tables, stats, logs = extract_tables_from_pdf(pdf_bytes, pages)
+            stream = SSE_TYPE in self.headers.get("Accept", "")
+            if stream: self._start_stream()
+            emit = self._event if stream else None
+            tables, stats, logs = extract_tables_from_pdf(pdf_bytes, pages, emit)
+            def note(msg, level):
+                entry = {"msg": msg, "level": level, "time": datetime.now().strftime("%H:%M:%S")}
+                logs.append(entry)
+                if stream: self._event("log", entry)
 
             download_token = None
             if tables:
@@ -230,23 +252,24 @@ class handler(BaseHTTPRequestHandler):
                 _cleanup()
                 _file_store[token] = {"data": xlsx_data, "created": time.time()}
                 download_token = token
-                logs.append({"msg": f"Excel generated — {len(xlsx_data)//1024} KB", "level": "ok", "time": datetime.now().strftime("%H:%M:%S")})
+                note(f"Excel generated — {len(xlsx_data)//1024} KB", "ok")
             else:
-                logs.append({"msg": "No tables detected", "level": "err", "time": datetime.now().strftime("%H:%M:%S")})
+                note("No tables detected", "err")
 
             _record(ip)
             updated = _check_rate(ip)
 
-            previews = []
-            for i, tbl in enumerate(tables[:3]):
-                previews.append({"id": i+1, "cols": tbl["cols"], "rows": tbl["rows"][:6], "total_rows": tbl["total_rows"]})
-
-            self._json(200, {"stats": stats, "logs": logs, "previews": previews,
+            result = {"stats": stats, "logs": logs, "previews": _previews(tables[:3]),
                 "extra_count": max(0, len(tables) - 3), "download_token": download_token,
-                "rate": {"remaining": updated.get("remaining", 0), "limit": RATE_LIMIT}})
+                "rate": {"remaining": updated.get("remaining", 0), "limit": RATE_LIMIT}}
+            if stream: self._event("done", result)
+            else: self._json(200, result)
 
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # streaming client went away
         except Exception as e:
-            self._json(500, {"error": str(e)})
+            if getattr(self, "_streaming", False): self._event("error", {"error": str(e)})
+            else: self._json(500, {"error": str(e)})
 
     def do_OPTIONS(self):
         self.send_response(200); self._cors()
@@ -257,6 +280,16 @@ class handler(BaseHTTPRequestHandler):
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
 
+    def _start_stream(self):
+        """SSE response without Content-Length; the connection closes when the body ends."""
+        self.send_response(200); self._cors()
+        self.send_header("Content-Type", SSE_TYPE)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers(); self.close_connection = True; self._streaming = True
+
+    def _event(self, name, data):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()); self.wfile.flush()
+
     def _json(self, code, data):
         body = json.dumps(data).encode()
         self.send_response(code); self._cors()
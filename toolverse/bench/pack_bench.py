@@ -0,0 +1,142 @@
+"""
+Packing benchmark: seeded synthetic manifests x every container in packengine.
+
+Records runtime, peak memory, pack rate and space utilization per case and compares
+them against a JSON baseline; exits 1 when a case regresses past the tolerances.
+
+    python bench/pack_bench.py                    # run and compare with bench/baseline.json
+    python bench/pack_bench.py --save --runs 5    # run and (re)write the baseline
+    python bench/pack_bench.py --kinds pallets --containers 40HC --engine numpy
+"""
+import argparse, gc, json, multiprocessing, os, platform, random, statistics, sys, time, tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "baseline.json")
+
+def load_engine():
+    sys.path.insert(0, os.path.join(HERE, ".."))
+    import packengine
+    return packengine
+
+def _line(name, l, h, w, kg, qty, stack, rot):
+    return {"name":name,"length":l,"height":h,"width":w,"weight":kg,"quantity":qty,"stackLimit":stack,"allowRotate":rot}
+
+# each generator returns cargo lines totalling about n units
+def pallets(r, n):
+    """A few homogeneous pallet types, mostly one of them."""
+    sizes = [(120,100,80),(120,120,100),(110,90,110),(100,80,120)]
+    lines = [_line(f"Pallet {i}", *d, r.randint(200,600), 0, r.choice([2,3]), r.random()<.5) for i, d in enumerate(sizes)]
+    for _ in range(n): r.choice(lines[:1]*5+lines)["quantity"] += 1
+    return lines
+
+def cartons(r, n):
+    """Mixed carton sizes in moderate quantities."""
+    lines = []
+    while n > 0:
+        q = min(n, r.randint(10,120)); n -= q
+        lines.append(_line(f"Carton {len(lines)}", r.randint(20,90), r.randint(15,70), r.randint(20,80),
+                           r.randint(2,40), q, r.randint(3,10), r.random()<.6))
+    return lines
+
+def smallparts(r, n):
+    """Many small parts in large runs, so aggregate() builds blocks."""
+    lines = []
+    while n > 0:
+        q = min(n, r.randint(100,600)); n -= q
+        lines.append(_line(f"Part {len(lines)}", r.randint(5,20), r.randint(5,20), r.randint(5,20),
+                           r.randint(1,3), q, r.randint(5,20), r.random()<.5))
+    return lines
+
+def heavy(r, n):
+    """Heavy, stack-limited crates mixed with light fillers; weight-bound in the small containers."""
+    lines = []
+    while n > 0:
+        big = r.random() < .4; q = min(n, r.randint(5,40) if big else r.randint(20,150)); n -= q
+        lines.append(_line(f"{'Crate' if big else 'Filler'} {len(lines)}",
+                           r.randint(80,200) if big else r.randint(20,50), r.randint(60,120) if big else r.randint(20,50),
+                           r.randint(60,120) if big else r.randint(20,50), r.randint(300,1500) if big else r.randint(5,20),
+                           q, 1 if big else r.randint(2,6), not big))
+    return lines
+
+KINDS = {"pallets": pallets, "cartons": cartons, "smallparts": smallparts, "heavy": heavy}
+
+def manifest(kind, seed, n):
+    return KINDS[kind](random.Random(f"{kind}-{seed}"), n)
+
+def run_case(pk, cargo, ct, engine, group, repeat):
+    cd = pk.CONTAINERS[ct]; times = []
+    r = pk.run_packing(cargo, cd, 75, True, group, engine)  # warm-up: per-container caches, lazy imports
+    for _ in range(repeat):
+        t = time.perf_counter(); pk.run_packing(cargo, cd, 75, True, group, engine); times.append(time.perf_counter()-t)
+    # a fresh process per case, so the peak does not depend on what earlier cases left cached or uncollected
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        peak = pool.submit(_peak, cargo, ct, engine, group).result()
+    st = r["stats"]
+    return {"time_s":round(statistics.median(times), 4),"peak_kb":round(peak/1024),"pack_rate":st["pack_rate"],
+            "space_utilization":st["space_utilization"],"packed_count":st["packed_count"]}
+
+def _peak(cargo, ct, engine, group):
+    """Peak traced bytes of one run, in a process that has done nothing else."""
+    pk = load_engine(); cd = pk.CONTAINERS[ct]
+    gc.collect(); tracemalloc.start()
+    pk.run_packing(cargo, cd, 75, True, group, engine)
+    peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return peak
+
+def compare(cur, base, tol_time, tol_mem, tol_fill, min_time=0.02):
+    """Regression messages for cases present in both runs; slowdowns under min_time seconds are noise."""
+    out = []
+    for name, c in cur.items():
+        b = base.get(name)
+        if not b: continue
+        if c["time_s"] > b["time_s"]*(1+tol_time) and c["time_s"]-b["time_s"] > min_time:
+            out.append(f"{name}: time {b['time_s']}s -> {c['time_s']}s")
+        if c["peak_kb"] > b["peak_kb"]*(1+tol_mem) and c["peak_kb"]-b["peak_kb"] > 64:
+            out.append(f"{name}: peak memory {b['peak_kb']}KB -> {c['peak_kb']}KB")
+        for k in ("pack_rate", "space_utilization"):
+            if c[k] < b[k]-tol_fill: out.append(f"{name}: {k} {b[k]} -> {c[k]}")
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--kinds", nargs="+", default=list(KINDS), choices=list(KINDS))
+    ap.add_argument("--containers", nargs="+")
+    ap.add_argument("--units", type=int, nargs="+", default=[500, 3000])
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--engine", default="python")
+    ap.add_argument("--group", action="store_true", help="pack with group_units")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs per case, after a warm-up; the median counts")
+    ap.add_argument("--runs", type=int, default=1, help="measure each case this many times; the median time counts")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="write this run as the baseline instead of comparing")
+    ap.add_argument("--tol-time", type=float, default=0.25, help="allowed relative slowdown")
+    ap.add_argument("--min-time", type=float, default=0.02, help="ignore slowdowns smaller than this (seconds)")
+    ap.add_argument("--tol-mem", type=float, default=0.25, help="allowed relative peak memory growth")
+    ap.add_argument("--tol-fill", type=float, default=0.5, help="allowed drop in pack rate / utilization, in points")
+    a = ap.parse_args(argv)
+    pk = load_engine(); cases = {}
+    for kind in a.kinds:
+        for n in a.units:
+            cargo = manifest(kind, a.seed, n)
+            for ct in a.containers or list(pk.CONTAINERS):
+                name = f"{kind}-{n}-{ct}"; runs = [run_case(pk, cargo, ct, a.engine, a.group, a.repeat) for _ in range(a.runs)]
+                cases[name] = c = dict(runs[0], time_s=statistics.median(r["time_s"] for r in runs))
+                print(f"{name:24s} {c['time_s']:8.3f}s {c['peak_kb']:7d}KB  rate {c['pack_rate']:5.1f}%  util {c['space_utilization']:5.1f}%")
+    run = {"meta":{"python":platform.python_version(),"machine":platform.machine(),"engine":a.engine,
+                   "group":a.group,"seed":a.seed},"cases":cases}
+    if a.save:
+        with open(a.baseline, "w") as f: json.dump(run, f, indent=1, sort_keys=True); f.write("\n")
+        print(f"baseline written to {a.baseline}"); return 0
+    if not os.path.exists(a.baseline):
+        print(f"no baseline at {a.baseline}; run with --save first"); return 0
+    with open(a.baseline) as f: base = json.load(f)
+    if {k: base["meta"].get(k) for k in ("engine", "group", "seed")} != {k: run["meta"][k] for k in ("engine", "group", "seed")}:
+        print("note: baseline was recorded with different engine/group/seed settings")
+    bad = compare(cases, base["cases"], a.tol_time, a.tol_mem, a.tol_fill, a.min_time)
+    for msg in bad: print("REGRESSION", msg)
+    print(f"{len(bad)} regression(s) against {a.baseline}")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+3D bin packing engine shared by the /api/pack routes (extreme points algorithm).
+
+Names are resolved lazily from the submodules on first access, so `import packengine`
+is cheap and a handler only pays for what its request uses:
+
+    core     containers, Item/Box, Packer, Probe, get_engine
+    fast     NumpyPacker (imports numpy)
+    plan     aggregate, prepare, pack_units, run_packing, run_fleet, run_incremental
+    search   run_search and the process pool (imports concurrent.futures)
+    service  check_request, solve, run_batch
+    cache    ResultCache, CACHE, cache_key
+    encode   columnar / float32 / NDJSON encodings
+    handler  the BaseHTTPRequestHandler the Vercel routes re-export (import it from here)
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    "core": ("CONTAINERS", "ENGINES", "container_spec", "container_info", "Item", "Box", "Packer", "Probe", "get_engine", "numpy_available"),
+    "fast": ("NumpyPacker",),
+    "plan": ("aggregate", "prepare", "pack_units", "summarize", "run_packing", "run_fleet", "run_incremental"),
+    "search": ("STRATEGIES", "run_search"),
+    "service": ("BadRequest", "check_request", "solve", "run_batch"),
+    "cache": ("ResultCache", "CACHE", "cache_key"),
+    "encode": ("BINARY_TYPE", "COLUMNAR_TYPE", "NDJSON_TYPE", "encode_binary", "encode_columnar"),
+}
+_WHERE = {name: mod for mod, names in _EXPORTS.items() for name in names}
+__all__ = list(_WHERE)
+
+def __getattr__(name):
+    mod = _WHERE.get(name)
+    if mod is None: raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{mod}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,96 @@
+"""Result cache for pack requests, keyed by a normalized hash of the request body."""
+import hashlib, json, os, threading, time
+from collections import OrderedDict
+
+from .plan import _upright
+
+class ResultCache:
+    """LRU of packing results with TTL eviction, optionally mirrored to JSON files in path.
+
+    The files get the same TTL and are capped at disk_size, oldest first; both are enforced on put().
+    """
+
+    def __init__(self, size=128, ttl=600, path=None, disk_size=1024):
+        self.size = size; self.ttl = ttl; self.path = path; self.disk_size = disk_size
+        self.data = OrderedDict()  # key -> (stored_at, result)
+        self.hits = self.misses = 0; self.lock = threading.Lock()
+        if path: os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            hit = self.data.get(key)
+            if hit and now-hit[0] < self.ttl:
+                self.data.move_to_end(key); self.hits += 1; return hit[1]
+            self.data.pop(key, None)
+        if self.path:
+            try:
+                f = self._file(key)
+                if now-os.path.getmtime(f) < self.ttl:
+                    with open(f) as fh: result = json.load(fh)
+                    self._remember(key, result, now)
+                    with self.lock: self.hits += 1
+                    return result
+            except (OSError, ValueError):
+                pass
+        with self.lock: self.misses += 1
+        return None
+
+    def _remember(self, key, result, now):
+        with self.lock:
+            self.data[key] = (now, result); self.data.move_to_end(key)
+            while len(self.data) > self.size: self.data.popitem(last=False)
+
+    def put(self, key, result):
+        self._remember(key, result, time.time())
+        if self.path:
+            try:
+                tmp = self._file(key) + ".tmp"
+                with open(tmp, "w") as fh: json.dump(result, fh)
+                os.replace(tmp, self._file(key))
+            except OSError:
+                pass
+            self._prune()
+
+    def _prune(self):
+        """Drop expired cache files, then the oldest ones beyond disk_size."""
+        now = time.time(); files = []
+        try:
+            with os.scandir(self.path) as it:
+                for e in it:
+                    if not e.name.endswith((".json", ".tmp")): continue
+                    try: files.append((e.stat().st_mtime, e.path))
+                    except OSError: pass
+        except OSError:
+            return
+        files.sort()
+        live = [f for f in files if now-f[0] < self.ttl and f[1].endswith(".json")]
+        keep = set(p for _, p in live[-self.disk_size:]) if self.disk_size > 0 else set()
+        for mtime, p in files:
+            # a fresh .tmp is another writer's put in progress
+            if p in keep or (p.endswith(".tmp") and now-mtime < self.ttl): continue
+            try: os.remove(p)
+            except OSError: pass
+
+    def info(self, hit):
+        n = self.hits + self.misses
+        return {"hit":hit,"hits":self.hits,"misses":self.misses,"hit_rate":round(self.hits/n*100,1) if n else 0}
+
+CACHE = ResultCache(int(os.environ.get("PACK_CACHE_SIZE", 128)), float(os.environ.get("PACK_CACHE_TTL", 600)),
+                    os.environ.get("PACK_CACHE_DIR") or None, int(os.environ.get("PACK_CACHE_DISK_SIZE", 1024)))
+
+def cache_key(body):
+    """Hash of the request fields that decide the plan; item lines are normalized and sorted."""
+    items = sorted(json.dumps({"name":c["name"],"length":c["length"],"height":c["height"],"width":c["width"],
+                               "weight":c["weight"],"quantity":c["quantity"],"stackLimit":c.get("stackLimit",10),
+                               "allowRotate":bool(c.get("allowRotate",False)),"upright":_upright(c)}, sort_keys=True)
+                   for c in body.get("items", []))
+    spec = {"container_type":body.get("container_type","40HC"),"container":body.get("container"),"fleet":body.get("fleet"),
+            "support_ratio":body.get("support_ratio",75),"enable_aggregation":body.get("enable_aggregation",True),
+            "group_units":body.get("group_units",False),"search":bool(body.get("search")),"items":items,
+            # a plan found under a small budget may be weaker than one a bigger budget would find
+            "time_budget_ms":body.get("time_budget_ms"),"search_budget_ms":body.get("search_budget_ms")}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
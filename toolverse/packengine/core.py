@@ -0,0 +1,374 @@
+"""Packing model and extreme-point packer: containers, Item/Box records, Packer and Probe."""
+import json, math, os, time
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+# named container registry: inner dims (cm) and payload (kg); PACK_CONTAINERS_FILE may add more
+CONTAINERS = {
+    "40HC": {"length": 1203, "height": 269, "width": 235, "maxWeight": 28500},
+    "40GP": {"length": 1203, "height": 239, "width": 235, "maxWeight": 26000},
+    "20GP": {"length": 589,  "height": 239, "width": 235, "maxWeight": 28000},
+    "45HC": {"length": 1355, "height": 269, "width": 235, "maxWeight": 27700},
+    "20RF": {"length": 544,  "height": 226, "width": 229, "maxWeight": 27400},
+    "40RF": {"length": 1158, "height": 250, "width": 229, "maxWeight": 29000},
+    "TRUCK-13.6": {"length": 1360, "height": 270, "width": 245, "maxWeight": 24000},
+    "TRUCK-7.2":  {"length": 720,  "height": 240, "width": 235, "maxWeight": 10000},
+}
+CONTAINER_DIMS = ("length", "height", "width", "maxWeight")
+
+GRID_CELL = 40  # edge (cm) of the uniform grid cells used to index packed boxes
+INF = float("inf")
+CHEAP_EPS = 32  # extreme points scanned per unit once a time budget is nearly spent
+PROFILE_DIR = os.environ.get("PACK_PROFILE_DIR")  # where "profile": "cprofile" runs also dump a .prof file
+
+def container_spec(ref):
+    """Container dict for a registry name, or a checked copy of an inline spec; raises ValueError.
+
+    Inline specs give length/height/width (cm) and maxWeight (kg), plus an optional name.
+    """
+    if isinstance(ref, str):
+        if ref not in CONTAINERS: raise ValueError(f"Unknown container: {ref}")
+        return CONTAINERS[ref]
+    if not isinstance(ref, dict): raise ValueError(f"Bad container: {ref!r}")
+    for k in CONTAINER_DIMS:
+        v = ref.get(k)
+        # json.loads lets NaN and Infinity through; neither makes a packable container
+        if isinstance(v, bool) or not isinstance(v, (int, float)) or not math.isfinite(v) or v <= 0:
+            raise ValueError(f"Container {k} must be a positive, finite number")
+    spec = {k: ref[k] for k in CONTAINER_DIMS}
+    if ref.get("name"): spec["name"] = str(ref["name"])
+    return spec
+
+def _load_registry(path):
+    with open(path) as f: extra = json.load(f)
+    for name, spec in extra.items(): CONTAINERS[name] = container_spec(spec)
+
+if os.environ.get("PACK_CONTAINERS_FILE"): _load_registry(os.environ["PACK_CONTAINERS_FILE"])
+
+class ContainerInfo:
+    """Size-derived data shared by every pack into containers of the same inner dims."""
+    __slots__ = ("volume", "small", "medium")
+
+    def __init__(self, l, h, w):
+        self.volume = l*h*w
+        self.small = (l/10, h/10, w/10)  # units under these on every axis are "small" for aggregate()
+        self.medium = (l/3, h/3, w/3)
+
+@lru_cache(maxsize=256)
+def _info(l, h, w):
+    return ContainerInfo(l, h, w)
+
+def container_info(cd):
+    """Cached ContainerInfo for a container (or fleet-minimum) dims dict."""
+    return _info(cd["length"], cd["height"], cd["width"])
+
+def unit_layers(isAgg, h, origH):
+    """Unit layers in a unit or box of height h: a block of ny layers counts ny against stackLimit."""
+    return max(1, round(h/origH)) if isAgg else 1
+
+class Item:
+    """One placement unit: a single carton, or an aggregated slab of identical ones.
+
+    allowRotate lets the unit turn about its height axis; with upright=False it may
+    also be laid on any side (all 6 orientations).
+    """
+    __slots__ = ("name","length","height","width","weight","stackLimit","allowRotate","isAgg","aggCnt","tk",
+                 "origL","origH","origW","upright","_ors")
+
+    def __init__(self, name, length, height, width, weight, stackLimit=10, allowRotate=False,
+                 isAgg=False, aggCnt=1, tk=None, origL=None, origH=None, origW=None, upright=True):
+        self.name = name; self.length = length; self.height = height; self.width = width
+        self.weight = weight; self.stackLimit = stackLimit; self.allowRotate = allowRotate
+        self.isAgg = isAgg; self.aggCnt = aggCnt; self.tk = tk
+        self.origL = length if origL is None else origL
+        self.origH = height if origH is None else origH
+        self.origW = width if origW is None else origW
+        self.upright = upright; self._ors = None
+
+    def orientations(self):
+        """This unit first, then each distinct allowed (length, height, width) turn of it; cached."""
+        if self._ors is None:
+            l, h, w = self.length, self.height, self.width
+            dims = [(l,h,w)]
+            if self.allowRotate:
+                dims += [(w,h,l)] if self.upright else [(w,h,l),(l,w,h),(w,l,h),(h,l,w),(h,w,l)]
+            self._ors = [self]
+            for d in dict.fromkeys(dims[1:]):
+                if d != (l,h,w):
+                    self._ors.append(Item(self.name, *d, self.weight, self.stackLimit, False, self.isAgg,
+                                          self.aggCnt, self.tk, self.origL, self.origH, self.origW))
+        return self._ors
+
+class Box:
+    """A placed Item; turned into the packed_items JSON shape only by to_json()."""
+    __slots__ = ("name","l","h","w","wt","x","y","z","isAgg","aggCnt","tk","stackLimit","stackLayer","origL","origH","origW")
+
+    def __init__(self, item, x, y, z, stackLayer):
+        self.name = item.name; self.l = item.length; self.h = item.height; self.w = item.width
+        self.wt = item.weight; self.x = x; self.y = y; self.z = z
+        self.isAgg = item.isAgg; self.aggCnt = item.aggCnt; self.tk = item.tk
+        self.stackLimit = item.stackLimit; self.stackLayer = stackLayer
+        self.origL = item.origL; self.origH = item.origH; self.origW = item.origW
+
+    def to_json(self):
+        return {"name":self.name,"l":self.l,"h":self.h,"w":self.w,"wt":self.wt,
+                "x":self.x,"y":self.y,"z":self.z,"isAgg":self.isAgg,"aggCnt":self.aggCnt,
+                "stackLayer":self.stackLayer,"stackLimit":self.stackLimit,
+                "origL":self.origL,"origH":self.origH,"origW":self.origW}
+
+class Packer:
+    PROBED = ("can_place", "check_support", "check_stack", "place")  # hot-path methods a Probe counts and times
+
+    def __init__(self, cont, min_sup_pct):
+        self.cL = cont["length"]; self.cH = cont["height"]; self.cW = cont["width"]
+        self.maxW = cont["maxWeight"]; self.minSup = min_sup_pct / 100.0
+        self.eps = [{"x":0,"y":0,"z":0}]; self.packed = []; self.totalW = 0
+        self.keys = [(0,0,0)]  # (y,x,z) of each entry in eps, kept sorted for bisect
+        self.minDim = 0  # smallest edge of any unit still to pack; see prune()
+        self.epLimit = None  # scan only the first epLimit extreme points (cheap first-fit)
+        self.truncated = False  # set when a time budget stopped packing early
+        self.grid = {}  # (i,j,k) cell -> packed boxes touching it
+        self.tops = {}  # (int(top*10),i,k) -> packed boxes whose top face is at that height over floor cell (i,k)
+        self._sl = None  # (ep, item, stackLayer) computed by the last check_stack
+        self.on_place = None  # optional callback(box) run as each placement is committed
+
+    def _cells(self, x, y, z, l, h, w):
+        c = GRID_CELL
+        for i in range(int(x//c), int((x+l)//c)+1):
+            for j in range(int(y//c), int((y+h)//c)+1):
+                for k in range(int(z//c), int((z+w)//c)+1):
+                    yield (i,j,k)
+
+    def _index(self, p):
+        for key in self._cells(p.x,p.y,p.z,p.l,p.h,p.w): self.grid.setdefault(key,[]).append(p)
+        b = int((p.y+p.h)*10)
+        for i,_,k in self._cells(p.x,0,p.z,p.l,0,p.w): self.tops.setdefault((b,i,k),[]).append(p)
+
+    def _tops_at(self, x, y, z, l, w):
+        """Packed boxes with a top face at height y whose floor cells meet the x/z footprint."""
+        b = int(y*10); seen = set()
+        for i,_,k in self._cells(x,0,z,l,0,w):
+            for t in (b-1, b, b+1):
+                for p in self.tops.get((t,i,k), ()):
+                    if id(p) not in seen and abs(p.y+p.h-y) < 0.1: seen.add(id(p)); yield p
+
+    def can_place(self, ep, l, h, w):
+        if ep["x"]+l > self.cL+0.01 or ep["y"]+h > self.cH+0.01 or ep["z"]+w > self.cW+0.01:
+            return False
+        grid = self.grid
+        for key in self._cells(ep["x"],ep["y"],ep["z"],l,h,w):
+            for p in grid.get(key, ()):
+                if not (ep["x"]+l<=p.x+0.01 or ep["x"]>=p.x+p.l-0.01 or
+                        ep["y"]+h<=p.y+0.01 or ep["y"]>=p.y+p.h-0.01 or
+                        ep["z"]+w<=p.z+0.01 or ep["z"]>=p.z+p.w-0.01):
+                    return False
+        return True
+
+    def check_support(self, x, y, z, l, w):
+        if y < 0.1: return True
+        ba = l * w; sa = 0.0
+        for p in self._tops_at(x, y, z, l, w):
+            sa += max(0,min(x+l,p.x+p.l)-max(x,p.x)) * max(0,min(z+w,p.z+p.w)-max(z,p.z))
+        return (sa/ba) >= self.minSup
+
+    def _below_same(self, ep, item):
+        fp = item.length*item.width; below = []; seen = set()
+        # only boxes in the grid column under the footprint can be stacked beneath ep
+        for key in self._cells(ep["x"],0,ep["z"],item.length,ep["y"],item.width):
+            for p in self.grid.get(key, ()):
+                if p.tk != item.tk or id(p) in seen: continue
+                seen.add(id(p))
+                if p.y+p.h > ep["y"]+0.1: continue
+                ox = max(0,min(ep["x"]+item.length,p.x+p.l)-max(ep["x"],p.x))
+                oz = max(0,min(ep["z"]+item.width,p.z+p.w)-max(ep["z"],p.z))
+                if ox*oz > min(fp, p.l*p.w)*0.3: below.append(p)
+        below.sort(key=lambda b:-(b.y+b.h))
+        return below
+
+    def check_stack(self, ep, item):
+        lim = item.stackLimit
+        if lim <= 0: return True
+        sl = self.stack_layer(ep, item); self._sl = (ep, item, sl)
+        return sl <= lim
+
+    def stack_layer(self, ep, item):
+        """Unit layer of item's top face at ep, counting the same-type boxes stacked beneath it."""
+        count = 0; cb = ep["y"]
+        for b in self._below_same(ep, item):
+            if abs(b.y+b.h-cb) < 1.0: count += unit_layers(b.isAgg, b.h, b.origH); cb = b.y
+        return count + unit_layers(item.isAgg, item.height, item.origH)
+
+    def _useless(self, x, y, z):
+        d = self.minDim
+        return x+d > self.cL+0.01 or y+d > self.cH+0.01 or z+d > self.cW+0.01
+
+    def prune(self, min_dim):
+        """Raise minDim and drop extreme points that can no longer take any remaining unit."""
+        if min_dim <= self.minDim: return
+        self.minDim = min_dim
+        keep = [i for i, e in enumerate(self.eps) if not self._useless(e["x"], e["y"], e["z"])]
+        if len(keep) < len(self.eps):
+            self.eps = [self.eps[i] for i in keep]; self.keys = [self.keys[i] for i in keep]
+
+    def _add_ep(self, x, y, z):
+        if self._useless(x, y, z): return
+        keys = self.keys; k = (y, x, z)
+        # Each dominance sweep covers one side of k in (y,x,z) order instead of the whole list.
+        # The sets stay small (dominated points are never kept), so a linear sweep beats an index.
+        # A dominating point (<= on every axis) can only sit at or before k ...
+        for i in range(bisect_right(keys, (y, INF, INF))):
+            ky, kx, kz = keys[i]
+            if kx <= x and kz <= z and keys[i] != k: return
+        # ... and points it dominates only at or after it
+        lo = bisect_left(keys, (y,))
+        drop = [i for i in range(lo, len(keys)) if keys[i][1] >= x and keys[i][2] >= z and keys[i] != k]
+        for i in reversed(drop): del keys[i]; del self.eps[i]
+        i = bisect_right(keys, k); keys.insert(i, k); self.eps.insert(i, {"x":x,"y":y,"z":z})
+
+    def _drop_ep(self, ep):
+        # the used point, plus any duplicate of it left behind by fill()'s tiling
+        keys = self.keys; x, y, z = ep["x"], ep["y"], ep["z"]
+        lo = bisect_left(keys, (y-0.01,)); hi = bisect_right(keys, (y+0.01, INF, INF))
+        for i in range(hi-1, lo-1, -1):
+            e = self.eps[i]
+            if e is ep or (abs(e["x"]-x)<=0.01 and abs(e["y"]-y)<=0.01 and abs(e["z"]-z)<=0.01):
+                del keys[i]; del self.eps[i]
+
+    def place(self, item, ep, sl=None):
+        """Place item at ep; sl is its stack layer when the caller already knows it."""
+        c = self._sl; self._sl = None
+        if sl is None: sl = c[2] if c and c[0] is ep and c[1] is item else self.stack_layer(ep, item)
+        p = Box(item, round(ep["x"],1), round(ep["y"],1), round(ep["z"],1), sl)
+        self.packed.append(p); self._index(p); self.totalW += item.weight
+        if self.on_place: self.on_place(p)
+        self._drop_ep(ep); x, y, z = ep["x"], ep["y"], ep["z"]
+        self._add_ep(x+item.length, y, z)
+        self._add_ep(x, y+item.height, z)
+        self._add_ep(x, y, z+item.width)
+
+    def fits(self, ep, item):
+        return (self.can_place(ep,item.length,item.height,item.width) and
+                self.check_support(ep["x"],ep["y"],ep["z"],item.length,item.width) and
+                self.check_stack(ep,item))
+
+    def candidates(self):
+        return self.eps if self.epLimit is None else self.eps[:self.epLimit]
+
+    def find(self, item):
+        """First (ep, oriented item) that fits, scanning extreme points in (y, x, z) order.
+
+        One pass serves every allowed orientation: the most preferred one (listed first in
+        item.orientations()) that fits anywhere wins, at its first point. Orientations that
+        overrun the container from a point are rejected there without a fits() call.
+        """
+        eps = self.candidates(); ors = item.orientations()
+        if len(ors) == 1:
+            for ep in eps:
+                if self.fits(ep, item): return ep, item
+            return None
+        L, H, W = self.cL+0.01, self.cH+0.01, self.cW+0.01
+        ors = [o for o in ors if o.length <= L and o.height <= H and o.width <= W]
+        hit = None; best = len(ors)  # only orientations preferred over the current hit are still tried
+        for ep in eps:
+            x, y, z = ep["x"], ep["y"], ep["z"]
+            for j in range(best):
+                o = ors[j]
+                if x+o.length <= L and y+o.height <= H and z+o.width <= W and self.fits(ep, o):
+                    hit = (ep, o); best = j; break
+            if best == 0: break
+        return hit
+
+    def try_place(self, item):
+        if self.totalW + item.weight > self.maxW: return False
+        hit = self.find(item)
+        if not hit: return False
+        self.place(hit[1], hit[0]); return True
+
+    def fill(self, item, n, deadline=None):
+        """Place up to n identical units of item; returns how many were placed.
+
+        The first unit goes through the extreme-point search. Further units are tiled
+        on a grid anchored at that spot in the same orientation (z rows, then x columns,
+        then y layers); when the tile is blocked the search runs again for the rest.
+        """
+        done = 0
+        while done < n and self.totalW + item.weight <= self.maxW:
+            if deadline and time.time() > deadline: self.truncated = True; break
+            hit = self.find(item)
+            if not hit: break
+            ep, u = hit; x0, y0, z0 = ep["x"], ep["y"], ep["z"]
+            self.place(u, ep); done += 1
+            y = y0
+            while y+u.height <= self.cH+0.01:
+                layer = 0; x = x0
+                while x+u.length <= self.cL+0.01:
+                    col = 0; z = z0
+                    while z+u.width <= self.cW+0.01:
+                        if done >= n or self.totalW + u.weight > self.maxW: return done
+                        e = {"x":x,"y":y,"z":z}
+                        if (x,y,z) != (x0,y0,z0) and self.fits(e, u):
+                            self.place(u, e); done += 1; col += 1
+                        z += u.width
+                    if not col and x != x0: break
+                    layer += col; x += u.length
+                if not layer and y != y0: break
+                y += u.height
+        return done
+
+ENGINES = ("python", "numpy")
+
+def get_engine(name):
+    """Packer class for an engine name; NumpyPacker (and numpy) is imported on first use."""
+    if name == "numpy":
+        from .fast import NumpyPacker
+        return NumpyPacker
+    return Packer
+
+def numpy_available():
+    from importlib.util import find_spec
+    return find_spec("numpy") is not None
+
+class Probe:
+    """Opt-in hot-path counters: calls and time of the packer's PROBED methods, and extreme-point list size.
+
+    attach() shadows the methods on one packer instance, so unprobed runs pay nothing;
+    one Probe may be attached to every packer of a fleet run. Each engine lists the methods
+    its find() actually goes through (the numpy engine batches overlap and support in _first_fit).
+    """
+    def __init__(self):
+        self.calls = {}; self.secs = {}
+        self.units = None; self.eps_max = self.eps_sum = self.eps_n = 0
+
+    def attach(self, packer, units):
+        # later packers of a fleet get the leftovers of the first, which are already counted
+        if self.units is None: self.units = len(units)
+        for name in packer.PROBED:
+            self.calls.setdefault(name, 0); self.secs.setdefault(name, 0.0)
+            setattr(packer, name, self._timed(name, getattr(packer, name)))
+        place = packer.place
+        def sampled(item, ep):
+            n = len(packer.eps); self.eps_max = max(self.eps_max, n); self.eps_sum += n; self.eps_n += 1
+            return place(item, ep)
+        packer.place = sampled
+
+    def _timed(self, name, fn):
+        calls, secs, clock = self.calls, self.secs, time.perf_counter
+        def timed(*a):
+            t = clock()
+            try: return fn(*a)
+            finally: secs[name] += clock()-t; calls[name] += 1
+        return timed
+
+    def report(self, prof=None):
+        out = {name: {"calls":self.calls[name],"ms":round(self.secs[name]*1000, 1)} for name in self.calls}
+        out["units"] = self.units or 0
+        out["eps"] = {"max":self.eps_max,"mean":round(self.eps_sum/self.eps_n, 1) if self.eps_n else 0}
+        if prof is not None:
+            import io, pstats
+            buf = io.StringIO(); pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(25)
+            out["cprofile"] = buf.getvalue()
+            if PROFILE_DIR:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                f = os.path.join(PROFILE_DIR, f"pack-{int(time.time()*1000)}-{os.getpid()}.prof")
+                prof.dump_stats(f); out["cprofile_file"] = f
+        return out
@@ -0,0 +1,54 @@
+"""Response encodings for packing results: columnar JSON, float32 rows and NDJSON helpers."""
+import json, struct
+from array import array
+
+# compact packed_items encodings; box attributes shared by many boxes go to a packed_types table
+BINARY_TYPE = "application/x-packing-f32"
+COLUMNAR_TYPE = "application/vnd.packing.columnar+json"
+ROW_FIELDS = ("x","y","z","l","h","w","wt","aggCnt","stackLayer","type")
+
+def _split_types(result):
+    """Copy result with each plan's packed_items swapped for per-field columns; returns (copy, plans)."""
+    out = dict(result); types = []; tix = {}
+    if "containers" in result: plans = out["containers"] = [dict(pl) for pl in result["containers"]]
+    else: plans = [out]
+    for pl in plans:
+        cols = {f: [] for f in ROW_FIELDS}
+        for p in pl.pop("packed_items"):
+            k = (p["name"], p["origL"], p["origH"], p["origW"], p["stackLimit"])
+            t = tix.get(k)
+            if t is None:
+                t = tix[k] = len(types)
+                types.append({"name":p["name"],"origL":p["origL"],"origH":p["origH"],"origW":p["origW"],"stackLimit":p["stackLimit"]})
+            p = dict(p, type=t)
+            for f in ROW_FIELDS: cols[f].append(p[f])
+        pl["packed_columns"] = cols
+    out["packed_types"] = types
+    return out, plans
+
+def encode_columnar(result):
+    """JSON body with packed_columns (one array per field, "type" indexing packed_types) per plan."""
+    return _split_types(result)[0]
+
+def encode_binary(result):
+    """uint32 LE header length, JSON header (space-padded to 4 bytes), then float32 LE rows.
+
+    Each plan's packed_rows gives its row offset/count; a row is ROW_FIELDS in order.
+    """
+    out, plans = _split_types(result); rows = array("f"); off = 0
+    for pl in plans:
+        cols = pl.pop("packed_columns"); n = len(cols["x"])
+        for i in range(n): rows.extend(cols[f][i] for f in ROW_FIELDS)
+        pl["packed_rows"] = {"offset":off,"count":n}; off += n
+    out["row_fields"] = list(ROW_FIELDS)
+    head = json.dumps(out).encode()
+    head += b" " * (-(4+len(head)) % 4)
+    if struct.pack("=I", 1) != struct.pack("<I", 1): rows.byteswap()
+    return struct.pack("<I", len(head)) + head + rows.tobytes()
+
+NDJSON_TYPE = "application/x-ndjson"
+
+def _without_items(result):
+    out = {k: v for k, v in result.items() if k != "packed_items"}
+    if "containers" in out: out["containers"] = [_without_items(c) for c in out["containers"]]
+    return out
@@ -0,0 +1,48 @@
+"""NumpyPacker: the "numpy" engine. Importing this module imports numpy."""
+import numpy as np
+
+from .core import Packer
+
+class NumpyPacker(Packer):
+    """Packer whose find() tests a batch of extreme points against every packed box at once.
+
+    Overlap and support are broadcast over (extreme point x packed box); only the points
+    that pass both go through the per-point stack check, in the usual (y, x, z) order,
+    so placements match Packer's.
+    """
+    CHUNK = 128  # extreme points evaluated per broadcast
+    PROBED = ("_first_fit", "check_stack", "place")
+
+    def __init__(self, cont, min_sup_pct):
+        super().__init__(cont, min_sup_pct)
+        self.arr = np.empty((256, 6)); self.n = 0  # x,y,z,l,h,w of each packed box
+
+    def _index(self, p):
+        super()._index(p)
+        if self.n == len(self.arr): self.arr = np.concatenate([self.arr, np.empty_like(self.arr)])
+        self.arr[self.n] = (p.x,p.y,p.z,p.l,p.h,p.w); self.n += 1
+
+    def _first_fit(self, item, eps, E):
+        l, h, w = item.length, item.height, item.width
+        ok = (E[:,0]+l <= self.cL+0.01) & (E[:,1]+h <= self.cH+0.01) & (E[:,2]+w <= self.cW+0.01)
+        px, py, pz, pl, ph, pw = self.arr[:self.n].T
+        for s in range(0, len(eps), self.CHUNK):
+            idx = np.flatnonzero(ok[s:s+self.CHUNK]) + s
+            if not len(idx): continue
+            x, y, z = E[idx,0:1], E[idx,1:2], E[idx,2:3]
+            hit = ~((x+l<=px+0.01) | (x>=px+pl-0.01) | (y+h<=py+0.01) | (y>=py+ph-0.01) |
+                    (z+w<=pz+0.01) | (z>=pz+pw-0.01))
+            ox = np.maximum(np.minimum(x+l,px+pl)-np.maximum(x,px), 0)
+            oz = np.maximum(np.minimum(z+w,pz+pw)-np.maximum(z,pz), 0)
+            sa = np.where(np.abs(py+ph-y) < 0.1, ox*oz, 0).sum(axis=1)
+            good = ~hit.any(axis=1) & ((y[:,0] < 0.1) | (sa/(l*w) >= self.minSup))
+            for i in idx[good]:
+                if self.check_stack(eps[i], item): return eps[i]
+        return None
+
+    def find(self, item):
+        eps = self.candidates(); E = np.array([(e["x"],e["y"],e["z"]) for e in eps]).reshape(-1, 3)
+        for o in item.orientations():
+            ep = self._first_fit(o, eps, E)
+            if ep is not None: return ep, o
+        return None
@@ -0,0 +1,98 @@
+"""HTTP handler for pack requests; api/pack.py and packing/api/pack.py re-export it as handler."""
+from http.server import BaseHTTPRequestHandler
+import json, time
+
+from .cache import CACHE, cache_key
+from .encode import (BINARY_TYPE, COLUMNAR_TYPE, NDJSON_TYPE, _without_items,
+                     encode_binary, encode_columnar)
+from .service import BadRequest, check_request, request_container, run_batch, solve
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length)) if length else {}
+            accept = self.headers.get("Accept", "")
+            fmt = body.get("format") or ("ndjson" if NDJSON_TYPE in accept else "binary" if BINARY_TYPE in accept else
+                                         "columnar" if COLUMNAR_TYPE in accept else "json")
+            if "jobs" in body: self._batch(body["jobs"], fmt == "ndjson"); return
+            try: check_request(body)
+            except BadRequest as e: self._json(400, {"error": str(e)}); return
+            fleet = body.get("fleet")
+            stream = fmt == "ndjson"; live = False
+            if stream: self._start_stream({"type":"start","container":None if fleet else request_container(body),"fleet":fleet})
+            # profiles need a fresh run; incremental plans depend on the previous plan sent along
+            use_cache = body.get("cache", True) and not body.get("profile") and body.get("previous") is None
+            key = cache_key(body) if use_cache else None
+            result = CACHE.get(key) if use_cache else None
+            if result is None:
+                result = solve(body, self._placement if stream else None)
+                live = stream and not body.get("search")
+                # truncated plans depend on the budget and machine load, so they are not reused
+                if use_cache and not result["stats"].get("truncated"): CACHE.put(key, result)
+                hit = False
+            else:
+                hit = True
+            if use_cache:
+                result = dict(result, stats=dict(result["stats"], cache=CACHE.info(hit)))
+            if stream:
+                if not live:  # cached or search results: replay the finished plan
+                    plans = result.get("containers", [result])
+                    for k, pl in enumerate(plans):
+                        for p in pl["packed_items"]:
+                            self._line(dict({"type":"placement"}, **({"container":k} if fleet else {}), **p))
+                self._line(dict({"type":"result"}, **_without_items(result)))
+            elif fmt == "binary": self._send(200, encode_binary(result), BINARY_TYPE)
+            elif fmt == "columnar": self._json(200, encode_columnar(result))
+            else: self._json(200, result)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # streaming client went away; raising out of on_place already stopped the packer
+        except Exception as e:
+            if getattr(self, "_streaming", False): self._line({"type":"error","error":str(e)})
+            else: self._json(500, {"error": str(e)})
+
+    def _batch(self, jobs, stream):
+        """POST {"jobs": [...]}: one record per job, streamed as each finishes or returned in order."""
+        if not isinstance(jobs, list) or not jobs: self._json(400, {"error": "No jobs provided"}); return
+        t0 = time.time()
+        if stream:
+            self._start_stream({"type":"start","jobs":len(jobs)})
+            for rec in run_batch(jobs): self._line(dict({"type":"job"}, **rec))
+            self._line({"type":"done","jobs":len(jobs),"calc_time":round(time.time()-t0, 3)}); return
+        results = sorted(run_batch(jobs), key=lambda r: r["index"])
+        self._json(200, {"results":results,"stats":{"jobs":len(jobs),"failed":sum(1 for r in results if "error" in r),
+                                                   "calc_time":round(time.time()-t0, 3)}})
+
+    def do_OPTIONS(self):
+        self.send_response(200); self._cors()
+        self.send_header("Content-Length", "0"); self.end_headers()
+
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+    def _start_stream(self, first):
+        """NDJSON response without Content-Length; the connection closes when the body ends."""
+        self.send_response(200); self._cors()
+        self.send_header("Content-Type", NDJSON_TYPE)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers(); self.close_connection = True; self._streaming = True
+        self._line(first)
+
+    def _line(self, rec):
+        self.wfile.write(json.dumps(rec).encode() + b"\n"); self.wfile.flush()
+
+    def _placement(self, box, k=None):
+        rec = {"type":"placement"}
+        if k is not None: rec["container"] = k
+        rec.update(box.to_json()); self._line(rec)
+
+    def _json(self, code, data):
+        self._send(code, json.dumps(data).encode(), "application/json")
+
+    def _send(self, code, body, ctype):
+        self.send_response(code); self._cors()
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers(); self.wfile.write(body)
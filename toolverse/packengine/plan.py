@@ -0,0 +1,287 @@
+"""Turning cargo lines into packing units and packing them into one container or a fleet."""
+import math, time
+from itertools import groupby
+
+from .core import CHEAP_EPS, GRID_CELL, INF, Item, container_info, container_spec, get_engine
+
+AGG_MIN_UNITS = 20  # a cargo type needs more units than this to be built into blocks
+
+def _under(l, h, w, lim):
+    return l<lim[0] and h<lim[1] and w<lim[2]
+
+def _block(s, n, cd, small):
+    """Block shape (fx, ny, fz, L, W) for n units of s: fx x fz per layer of L x W footprints, ny layers."""
+    lim = s.stackLimit if s.stackLimit > 0 else INF; best = None
+    for L, W in ((s.length, s.width), (s.width, s.length)) if s.allowRotate else ((s.length, s.width),):
+        fx = int((cd["length"] if small else cd["length"]/4)//L); fz = min(int(cd["width"]//W), n)
+        if not fx or not fz: continue
+        ny = int(max(1, min(lim, cd["height"]//s.height, n//fz)))
+        fx = max(1, min(fx, n//(fz*ny)))
+        # layers before length: blocks grow as walls across the width, not as floor-hogging slabs;
+        # fill the container width first, then prefer the bigger block
+        cand = (fz*W, fx*fz*ny, fx, ny, fz, L, W)
+        if best is None or cand[:2] > best[:2]: best = cand
+    return best and best[2:]
+
+def _make_block(s, k, fx, ny, fz, L, W):
+    # blocks keep the unit stackLimit: the stack check counts their ny unit layers against it
+    return Item(s.name, L*fx, s.height*ny, W*fz, s.weight*fx*fz*ny, s.stackLimit, False,
+                True, fx*fz*ny, k, s.origL, s.origH, s.origW)
+
+def aggregate(items, cd):
+    """Build identical units into blocks of fx x fz per layer, stacked up to stackLimit layers.
+
+    Blocks span the container width and grow in layers before length: up to its full
+    length for small units (under 1/10 of every container dim), a quarter of it for medium
+    ones (under 1/3). Rotatable units also try the swapped footprint.
+    Leftovers become one block of whole layers where possible, the rest single units.
+    """
+    info = container_info(cd); groups = {}
+    for it in items: groups.setdefault(it.tk,[]).append(it)
+    result = []
+    for k, g in groups.items():
+        s = g[0]; n = len(g)
+        small = _under(s.length, s.height, s.width, info.small)
+        medium = _under(s.length, s.height, s.width, info.medium)
+        b = _block(s, n, cd, small) if n > AGG_MIN_UNITS and (small or medium) else None
+        if not b or b[0]*b[1]*b[2] <= 1: result.extend(g); continue
+        fx, ny, fz, L, W = b; nb, rem = divmod(n, fx*fz*ny)
+        result.extend([_make_block(s, k, fx, ny, fz, L, W)]*nb)
+        ly = rem//(fx*fz)  # leftover whole layers
+        if ly and fx*fz*ly > 1:
+            result.append(_make_block(s, k, fx, ly, fz, L, W)); rem -= fx*fz*ly
+        result.extend(g[n-rem:])
+    return result
+
+# unit orderings for prepare(); "band" (mid-size items first, then by volume) is the default
+ORDERS = {
+    "band": lambda a:(-(1 if 50<=max(a.length,a.height,a.width)<=500 else 0),-(a.length*a.height*a.width)),
+    "volume": lambda a:(-(a.length*a.height*a.width),),
+    "footprint": lambda a:(-(a.length*a.width),-a.height),
+    "height": lambda a:(-a.height,-(a.length*a.width)),
+}
+
+def _upright(c):
+    # cargo lines turn about the height axis only, unless they ask for all 6 orientations
+    return c.get("thisSideUp", False) or c.get("orientations", 2) != 6
+
+def prepare(cargo, cd, agg=True, order="band", rotate=False):
+    """Expand cargo lines into the sorted unit list the packer consumes; aggregate against cd's dims.
+
+    rotate=True starts rotatable lines in their length/width-swapped orientation.
+    """
+    expanded = []
+    for c in cargo:
+        tk = f"{c['name']}_{c['length']}_{c['height']}_{c['width']}"
+        r = rotate and c.get("allowRotate",False)
+        # units of a line are identical, so they share one Item record
+        unit = Item(c["name"], c["width"] if r else c["length"], c["height"], c["length"] if r else c["width"], c["weight"],
+                    c.get("stackLimit",10), c.get("allowRotate",False), tk=tk,
+                    origL=c["length"], origH=c["height"], origW=c["width"], upright=_upright(c))
+        expanded.extend([unit]*c["quantity"])
+    key = ORDERS[order]
+    expanded.sort(key=key)
+    if agg:
+        expanded = aggregate(expanded, cd)
+        then = ORDERS["volume"] if order == "band" else key
+        # blocks sort in among single units, so the big ones claim open floor first
+        expanded.sort(key=then)
+    return expanded
+
+def pack_units(units, container, sup=75, group=False, engine="python", t0=None, budget=None, on_place=None, probe=None,
+               packer=None):
+    """Pack prepared units into one container; returns (packer, unpacked units in their original order).
+
+    Pass packer to keep packing into one that already holds placements (see run_incremental()).
+
+    With a budget (seconds from t0) the packer drops to a cheap first-fit scan once 75% of it
+    is spent and stops at the deadline, leaving the rest unpacked and packer.truncated set.
+    """
+    # smallest edge among the units from i onwards, so the packer can prune dead extreme points
+    tail = [INF]*(len(units)+1)
+    for i in range(len(units)-1, -1, -1):
+        a = units[i]; tail[i] = min(tail[i+1], a.length, a.height, a.width)
+
+    packer = packer or get_engine(engine)(container, sup); packer.on_place = on_place; unpacked = []
+    if probe: probe.attach(packer, units)
+    deadline = cheap = None
+    if budget is not None:
+        t0 = t0 or time.time(); deadline = t0+budget; cheap = t0+budget*0.75
+
+    def tick():
+        if deadline is None: return True
+        now = time.time()
+        if now > deadline: packer.truncated = True; return False
+        if now > cheap: packer.epLimit = CHEAP_EPS
+        return True
+
+    if group:
+        # consecutive units share one Item record, so each run is packed as a block
+        i = 0
+        for item, run in groupby(units):
+            n = sum(1 for _ in run); packer.prune(tail[i]); i += n
+            done = packer.fill(item, n, deadline) if tick() else 0
+            unpacked.extend([item]*(n-done))
+    else:
+        for i, item in enumerate(units):
+            packer.prune(tail[i])
+            if not tick() or not packer.try_place(item): unpacked.append(item)
+    return packer, unpacked
+
+def _count_by_name(units):
+    out = {}
+    for u in units: out[u.name] = out.get(u.name,0)+u.aggCnt
+    return out
+
+def summarize(packer, unpacked, container, elapsed):
+    pc=sum(p.aggCnt for p in packer.packed); uc=sum(u.aggCnt for u in unpacked); total=pc+uc
+    cv=container_info(container).volume
+    uv=sum(p.l*p.h*p.w for p in packer.packed)
+    cx=cz=tw=0.0
+    for p in packer.packed: cx+=(p.x+p.l/2)*p.wt; cz+=(p.z+p.w/2)*p.wt; tw+=p.wt
+    if tw:
+        cx/=tw; cz/=tw
+        ox=abs(cx-container["length"]/2)/(container["length"]/2)*100
+        oz=abs(cz-container["width"]/2)/(container["width"]/2)*100
+        cog=round(math.sqrt(ox*ox+oz*oz),1)
+    else: cog=0
+
+    return {"container":container,"packed_items":[p.to_json() for p in packer.packed],
+        "packed_summary":_count_by_name(packer.packed),"unpacked_summary":_count_by_name(unpacked),
+        "stats":{"packed_count":pc,"unpacked_count":uc,
+            "pack_rate":round(pc/total*100,1) if total else 0,
+            "space_utilization":round(uv/cv*100,1) if cv else 0,
+            "actual_weight":round(packer.totalW,1),"max_weight":container["maxWeight"],
+            "weight_utilization":round(packer.totalW/container["maxWeight"]*100,1) if container["maxWeight"] else 0,
+            "calc_time":elapsed,"cog_offset":cog,"truncated":packer.truncated}}
+
+def run_packing(cargo, container, sup=75, agg=True, group=False, engine="python", budget=None, on_place=None, probe=None):
+    t0 = time.time()
+    units = prepare(cargo, container, agg)
+    packer, unpacked = pack_units(units, container, sup, group, engine, t0, budget, on_place, probe)
+    return summarize(packer, unpacked, container, round(time.time()-t0, 3))
+
+def _box_tk(b):
+    return f"{b['name']}_{b['origL']}_{b['origH']}_{b['origW']}"  # as prepare() keys the cargo line
+
+def _box_item(b):
+    """The Item a packed_items entry was placed as: same name, type, orientation and aggregate count."""
+    return Item(b["name"], b["l"], b["h"], b["w"], b["wt"], b["stackLimit"], False, b.get("isAgg", False),
+                b.get("aggCnt", 1), _box_tk(b), b["origL"], b["origH"], b["origW"])
+
+def _unit_of(b):
+    # one unit of an aggregated block; blocks carry their unit's own stackLimit
+    return Item(b["name"], b["origL"], b["origH"], b["origW"], b["wt"]/b.get("aggCnt", 1), b["stackLimit"],
+                False, tk=_box_tk(b))
+
+def _rests_on(a, b):
+    return (abs(a["y"]-(b["y"]+b["h"])) < 0.1 and min(a["x"]+a["l"],b["x"]+b["l"])-max(a["x"],b["x"]) > 0.01 and
+            min(a["z"]+a["w"],b["z"]+b["w"])-max(a["z"],b["z"]) > 0.01)
+
+def _floor_cells(b):
+    c = GRID_CELL
+    return [(i, k) for i in range(int(b["x"]//c), int((b["x"]+b["l"])//c)+1)
+            for k in range(int(b["z"]//c), int((b["z"]+b["w"])//c)+1)]
+
+def _take_out(boxes, remove):
+    """Pick the boxes to drop for remove=[{"name","quantity"}]; returns (dropped indexes, Items to place again, units removed).
+
+    Boxes with the least stacked on them go first (then the topmost, latest placed); the
+    order is fixed once per remove line. Whatever rests on a dropped box, directly or not,
+    is lifted out and placed again, as are the units of an aggregated block that are not
+    being removed.
+    """
+    gone = set(); back = []; removed = 0
+    floors = {}  # (bottom height in mm, floor grid cell) -> indexes of boxes standing there
+    for k, b in enumerate(boxes):
+        f = round(b["y"]*10)
+        for c in _floor_cells(b): floors.setdefault((f, c), []).append(k)
+    on = {}  # index -> boxes resting directly on it
+    def rest_on(j):
+        if j not in on:
+            b = boxes[j]; t = round((b["y"]+b["h"])*10)
+            near = {k for c in _floor_cells(b) for f in (t-1, t, t+1) for k in floors.get((f, c), ())}
+            on[j] = [k for k in sorted(near) if _rests_on(boxes[k], b)]
+        return on[j]
+    def above(i):
+        out = set(); todo = [i]
+        while todo:
+            for k in rest_on(todo.pop()):
+                if k not in gone and k not in out: out.add(k); todo.append(k)
+        return out
+    by_name = {}
+    for i, b in enumerate(boxes): by_name.setdefault(b["name"], []).append(i)
+    for r in remove:
+        need = r["quantity"]
+        lift = {i: above(i) for i in by_name.get(r["name"], ()) if i not in gone} if need > 0 else {}
+        for i in sorted(lift, key=lambda i: (len(lift[i]), -(boxes[i]["y"]+boxes[i]["h"]), -i)):
+            if need <= 0: break
+            if i in gone: continue
+            b = boxes[i]; n = b.get("aggCnt", 1); take = min(n, need); need -= take; removed += take
+            gone.add(i); back.extend([_unit_of(b)]*(n-take))
+            # boxes lifted with an earlier pick took everything above them along
+            for k in sorted(lift[i]-gone):
+                if boxes[k]["name"] == r["name"] and need > 0 and boxes[k].get("aggCnt", 1) <= need:
+                    # lifted anyway, so it counts towards the removal
+                    need -= boxes[k].get("aggCnt", 1); removed += boxes[k].get("aggCnt", 1)
+                else:
+                    back.append(_box_item(boxes[k]))
+                gone.add(k)
+    return gone, back, removed
+
+def run_incremental(previous, cargo, remove, container, sup=75, agg=True, engine="python", on_place=None):
+    """Update a finished plan instead of packing from scratch.
+
+    previous is an earlier result (its packed_items, in placement order). Units named in
+    remove=[{"name","quantity"}] are dropped, every other placement is replayed where it was
+    (rebuilding extreme points, indexes, stack layers and weight), and only the new cargo
+    lines, plus any boxes lifted off removed ones, go through the search. The replayed boxes
+    are reported through on_place too, so a streamed plan is complete.
+    """
+    t0 = time.time(); boxes = previous["packed_items"]
+    gone, back, removed = _take_out(boxes, remove or ())
+    packer = get_engine(engine)(container, sup); packer.on_place = on_place
+    for i, b in enumerate(boxes):
+        # nothing under a kept box was taken out (lifting goes all the way up), so its stack layer still holds
+        if i not in gone: packer.place(_box_item(b), {"x":b["x"],"y":b["y"],"z":b["z"]}, b["stackLayer"])
+    kept = len(packer.packed)
+    units = back + prepare(cargo, container, agg)
+    packer, unpacked = pack_units(units, container, sup, False, engine, t0, None, on_place, packer=packer)
+    r = summarize(packer, unpacked, container, round(time.time()-t0, 3))
+    r["stats"]["incremental"] = {"kept":kept,"removed":removed,"replaced":len(back),"added":len(units)-len(back)}
+    return r
+
+def run_fleet(cargo, fleet, sup=75, agg=True, group=False, engine="python", budget=None, on_place=None, probe=None):
+    """Pack cargo into a fleet mix, e.g. [{"type":"40HC","count":5},{"type":"20GP"}], in order.
+
+    A type is a registry name or an inline container spec (see container_spec()).
+    The unit list is prepared once and each container takes what the previous one left.
+    Aggregated slabs are sized against the smallest dims in the fleet so they fit any of them.
+    on_place(box, k) is told the index k of the container entry the box lands in.
+    """
+    t0 = time.time()
+    slots = []
+    for f in fleet:
+        t = f["type"]; spec = container_spec(t)
+        slots += [(t if isinstance(t, str) else spec.get("name","custom"), spec)]*f.get("count",1)
+    cd = {k: min(spec[k] for _, spec in slots) for k in ("length","height","width")}
+    units = prepare(cargo, cd, agg); total = sum(u.aggCnt for u in units)
+    loads = []; futile = set(); truncated = False  # futile: specs (by id) that packed nothing from the current remainder
+    for ct, spec in slots:
+        if not units: break
+        if id(spec) in futile: continue
+        t1 = time.time(); left_s = None if budget is None else budget-(t1-t0)
+        if left_s is not None and left_s <= 0: truncated = True; break
+        cb = on_place and (lambda b, k=len(loads): on_place(b, k))
+        packer, left = pack_units(units, spec, sup, group, engine, t1, left_s, cb, probe)
+        truncated = packer.truncated
+        if not packer.packed: futile.add(id(spec)); continue
+        r = summarize(packer, left, spec, round(time.time()-t1, 3))
+        r["container_type"] = ct; loads.append(r); units = left; futile.clear()
+        if truncated: break
+
+    pc = total-sum(u.aggCnt for u in units)
+    return {"containers":loads,"container_count":len(loads),"unpacked_summary":_count_by_name(units),
+        "stats":{"packed_count":pc,"unpacked_count":total-pc,
+            "pack_rate":round(pc/total*100,1) if total else 0,
+            "calc_time":round(time.time()-t0, 3),"truncated":truncated}}
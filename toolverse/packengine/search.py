@@ -0,0 +1,63 @@
+"""Strategy search and batch jobs over a process pool; imported only by requests that use them."""
+import os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FutureTimeout
+
+from .plan import pack_units, prepare, summarize
+
+# variants tried by run_search(); keys are prepare()/pack_units() options
+STRATEGIES = [
+    {"name":"band"},
+    {"name":"band-noagg","agg":False},
+    {"name":"band-rotated","rotate":True},
+    {"name":"band-grouped","group":True},
+    {"name":"volume","order":"volume"},
+    {"name":"footprint","order":"footprint"},
+    {"name":"height","order":"height"},
+]
+
+def _run_strategy(job):
+    cargo, container, sup, st, deadline = job
+    t0 = time.time()
+    units = prepare(cargo, container, st.get("agg",True), st.get("order","band"), st.get("rotate",False))
+    packer, unpacked = pack_units(units, container, sup, st.get("group",False), st.get("engine","python"),
+                                  t0, max(0, deadline-t0))
+    r = summarize(packer, unpacked, container, round(time.time()-t0, 3))
+    r["stats"]["strategy"] = st["name"]
+    return r
+
+def _score(r):
+    s = r["stats"]
+    return (s["pack_rate"], s["space_utilization"], -s["cog_offset"])
+
+def _submit_all(fn, jobs, workers=None):
+    """Submit fn(job) for every job to a new process pool; returns (pool, futures) or (None, None)."""
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1))
+        return pool, [pool.submit(fn, j) for j in jobs]
+    except (OSError, NotImplementedError):  # e.g. no /dev/shm semaphores in serverless sandboxes
+        return None, None
+
+def run_search(cargo, container, sup=75, strategies=STRATEGIES, budget=10.0, workers=None):
+    """Run several packing strategies in a process pool and return the best plan.
+
+    Best is highest pack rate, then space utilization, then lowest cog_offset. Each strategy
+    packs under the same deadline (budget seconds from now), so late ones return truncated
+    partial plans rather than overrunning. Falls back to running them in-process where
+    multiprocessing is unavailable.
+    """
+    t0 = time.time(); jobs = [(cargo, container, sup, st, t0+budget) for st in strategies]; results = []
+    pool, futs = _submit_all(_run_strategy, jobs, workers)
+    if pool:
+        try:
+            for f in as_completed(futs, timeout=max(0, budget-(time.time()-t0))): results.append(f.result())
+        except FutureTimeout:
+            if not results: results.append(next(as_completed(futs)).result())
+        pool.shutdown(wait=False, cancel_futures=True)
+    else:
+        for j in jobs:
+            if results and time.time()-t0 > budget: break
+            results.append(_run_strategy(j))
+    best = max(results, key=_score)
+    best["stats"]["strategies_tried"] = len(results)
+    best["stats"]["calc_time"] = round(time.time()-t0, 3)
+    return best
@@ -0,0 +1,123 @@
+"""Request handling shared by every route: validation, dispatch, profiling and batch jobs."""
+import time
+
+from .core import ENGINES, Probe, container_spec, numpy_available
+from .plan import run_fleet, run_incremental, run_packing
+
+class BadRequest(ValueError):
+    pass
+
+MAX_FLEET = 100  # containers a fleet request may list in total
+
+def check_request(body):
+    """Raise BadRequest if a pack request body (or batch job) cannot be run."""
+    fleet = body.get("fleet")
+    if fleet: _check_fleet(fleet)
+    try:
+        if not fleet: request_container(body)
+        for f in fleet or (): container_spec(f.get("type"))
+    except ValueError as e:
+        raise BadRequest(str(e))
+    prev = body.get("previous")
+    if prev is not None:
+        if body.get("fleet") or body.get("search"): raise BadRequest("previous cannot be combined with fleet or search")
+        _check_previous(prev, request_container(body))
+        if body.get("remove") is not None: _check_remove(body["remove"])
+        if not body.get("items") and not body.get("remove"): raise BadRequest("No items to add or remove")
+    elif not body.get("items"): raise BadRequest("No items provided")
+    engine = body.get("engine", "python")
+    if engine not in ENGINES: raise BadRequest(f"Unknown engine: {engine}")
+    if engine == "numpy" and not numpy_available(): raise BadRequest("numpy engine is not available")
+    for c in body.get("items") or ():
+        if c.get("orientations", 2) not in (2, 6): raise BadRequest(f"orientations must be 2 or 6: {c.get('name')}")
+
+def _check_fleet(fleet):
+    if not isinstance(fleet, list): raise BadRequest("fleet must be a list of {\"type\", \"count\"} entries")
+    total = 0
+    for f in fleet:
+        if not isinstance(f, dict): raise BadRequest("fleet entries must be objects like {\"type\":\"40HC\",\"count\":2}")
+        n = f.get("count", 1)
+        if type(n) is not int or n < 1: raise BadRequest(f"fleet count must be a positive integer: {n!r}")
+        total += n
+    if total > MAX_FLEET: raise BadRequest(f"fleet lists {total} containers; at most {MAX_FLEET} are allowed")
+
+def _check_remove(remove):
+    if not isinstance(remove, list): raise BadRequest("remove must be a list of {\"name\", \"quantity\"} entries")
+    for r in remove:
+        if not isinstance(r, dict) or not isinstance(r.get("name"), str):
+            raise BadRequest("remove entries must be objects like {\"name\":\"Box A\",\"quantity\":2}")
+        n = r.get("quantity")
+        if type(n) is not int or n < 1: raise BadRequest(f"remove quantity must be a positive integer: {n!r}")
+
+def _check_previous(prev, cd):
+    boxes = prev.get("packed_items") if isinstance(prev, dict) else None
+    if not isinstance(boxes, list): raise BadRequest("previous must be a result with packed_items")
+    for b in boxes:
+        try:
+            inside = (b["x"]+b["l"] <= cd["length"]+0.1 and b["y"]+b["h"] <= cd["height"]+0.1 and
+                      b["z"]+b["w"] <= cd["width"]+0.1)
+            b["name"], b["wt"], b["stackLimit"], b["origL"], b["origH"], b["origW"]
+            layer_ok = type(b["stackLayer"]) is int and b["stackLayer"] >= 1
+        except (KeyError, TypeError):
+            raise BadRequest("previous packed_items need the full JSON box fields")
+        if not layer_ok: raise BadRequest(f"previous box {b['name']} has a bad stackLayer")
+        if not inside: raise BadRequest(f"previous box {b['name']} does not fit the container")
+
+def request_container(body):
+    """The container a single-container request packs into: inline "container" spec or "container_type" name."""
+    return container_spec(body.get("container") or body.get("container_type", "40HC"))
+
+def solve(body, on_place=None):
+    """Run a checked request body: fleet, strategy search or a single container.
+
+    "profile": true adds a hot-path breakdown to stats["profile"]; "cprofile" also runs
+    the whole solve under cProfile. Strategy search runs in worker processes and is not probed.
+    """
+    mode = body.get("profile")
+    if not mode or body.get("search"): return _dispatch(body, on_place)
+    probe = Probe(); prof = None
+    if mode == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+    if prof: prof.enable()
+    try: result = _dispatch(body, on_place, probe)
+    finally:
+        if prof: prof.disable()
+    result["stats"]["profile"] = probe.report(prof)
+    return result
+
+def _dispatch(body, on_place, probe=None):
+    budget = body.get("time_budget_ms")
+    budget = None if budget is None else budget/1000
+    opts = (body.get("support_ratio", 75), body.get("enable_aggregation", True), body.get("group_units", False),
+            body.get("engine", "python"), budget)
+    if body.get("fleet"):
+        return run_fleet(body["items"], body["fleet"], *opts, on_place=on_place, probe=probe)
+    ct = request_container(body)
+    if body.get("previous") is not None:
+        return run_incremental(body["previous"], body.get("items") or [], body.get("remove"), ct, opts[0], opts[1],
+                               opts[3], on_place)
+    if body.get("search"):
+        from .search import run_search
+        return run_search(body["items"], ct, opts[0], budget=body.get("search_budget_ms", body.get("time_budget_ms", 10000))/1000)
+    return run_packing(body["items"], ct, *opts, on_place=on_place, probe=probe)
+
+def _run_job(job):
+    t0 = time.time()
+    try:
+        check_request(job); job = dict(job, search=False)  # jobs already run one per worker
+        return {"result":solve(job),"time":round(time.time()-t0, 3)}
+    except Exception as e:
+        return {"error":str(e),"time":round(time.time()-t0, 3)}
+
+def run_batch(jobs, workers=None):
+    """Run independent pack jobs across a process pool; yields {"index", "result"|"error", "time"} as each finishes."""
+    from concurrent.futures import as_completed
+    from .search import _submit_all
+    pool, futs = _submit_all(_run_job, jobs, workers)
+    if pool is None:
+        for i, j in enumerate(jobs): yield dict(index=i, **_run_job(j))
+        return
+    index = {f: i for i, f in enumerate(futs)}
+    with pool:
+        for f in as_completed(futs): yield dict(index=index[f], **f.result())
@@ -1,4 +1,6 @@
 const API_BASE = window.location.origin;
+const PACK_F32 = 'application/x-packing-f32';
+const PACK_NDJSON = 'application/x-ndjson';
 const api = {
   async pack(payload) {
     const res = await fetch(API_BASE + '/api/pack', {
@@ -9,5 +11,61 @@ const api = {
     const data = await res.json();
     if (!res.ok) throw new Error(data.error || 'Request failed');
     return data;
+  },
+
+  // Same as pack(), but asks for the float32 row encoding: the result carries
+  // packed_types, row_fields and `rows` (a Float32Array over the response body)
+  // instead of packed_items; each plan's packed_rows gives its offset/count.
+  async packCompact(payload) {
+    const res = await fetch(API_BASE + '/api/pack', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': PACK_F32 },
+      body: JSON.stringify(payload),
+    });
+    if (!(res.headers.get('Content-Type') || '').startsWith(PACK_F32)) {
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error || 'Request failed');
+      return data;
+    }
+    const buf = await res.arrayBuffer();
+    const n = new DataView(buf).getUint32(0, true);
+    const data = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 4, n)));
+    data.rows = new Float32Array(buf, 4 + n);
+    return data;
+  },
+
+  // NDJSON stream: onEvent gets {type:'start'}, one {type:'placement'} per box as
+  // the packer commits it, then {type:'result'} (the usual result minus packed_items),
+  // which is also the resolved value. Abort with signal to stop the job early.
+  async packStream(payload, onEvent, signal) {
+    const res = await fetch(API_BASE + '/api/pack', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': PACK_NDJSON },
+      body: JSON.stringify(payload),
+      signal,
+    });
+    if (!(res.headers.get('Content-Type') || '').startsWith(PACK_NDJSON)) {
+      const data = await res.json();
+      throw new Error(data.error || 'Request failed');
+    }
+    const reader = res.body.getReader(), dec = new TextDecoder();
+    let buf = '', result = null;
+    const handle = line => {
+      if (!line) return;
+      const ev = JSON.parse(line);
+      if (ev.type === 'error') throw new Error(ev.error);
+      if (ev.type === 'result') result = ev;
+      onEvent(ev);
+    };
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buf += dec.decode(value, { stream: true });
+      const lines = buf.split('\n'); buf = lines.pop();
+      lines.forEach(handle);
+    }
+    handle(buf);
+    if (!result) throw new Error('Stream ended early');
+    return result;
   }
 };
@@ -6,6 +6,7 @@ const DEFAULT_ITEMS = [
   { name:"Long Parts", length:100, height:30, width:30, weight:50, quantity:20, stackLimit:5, allowRotate:true },
   { name:"Small Parts", length:10, height:10, width:10, weight:1, quantity:100, stackLimit:10, allowRotate:false }
 ];
+const STREAM_MIN_UNITS = 1500;  // orders at least this big use api.packStream()
 
 function createRow(it) {
   return '<tr><td><input class="cell-input" type="text" value="'+it.name+'" data-field="name"></td>'
@@ -71,12 +72,21 @@ async function startPacking() {
     const items = readTableData();
     if(!items.length){ alert('Please add items'); return; }
 
-    const result = await api.pack({
+    const payload = {
       container_type: document.getElementById('container-type').value,
       support_ratio: parseInt(document.getElementById('support-slider').value),
       enable_aggregation: document.getElementById('enable-aggregation').checked,
       items: items,
-    });
+    };
+    // big orders stream placements so the scene fills in while the packer runs
+    const units = items.reduce((n, it) => n + it.quantity, 0);
+    const streamed = units >= STREAM_MIN_UNITS;
+    const result = streamed
+      ? await api.packStream(payload, ev => {
+          if (ev.type === 'start') { beginStream(ev.container); ov.classList.remove('active'); }
+          else if (ev.type === 'placement') streamItem(ev);
+        })
+      : await api.packCompact(payload);
 
     const s = result.stats;
     document.getElementById('results-section').style.display='block';
@@ -90,9 +100,11 @@ async function startPacking() {
     document.getElementById('stat-cog').textContent = s.cog_offset+'%';
 
     updateTableStatus(result);
+    if (streamed) { endStream(result.container); return; }
     clearScene();
     renderContainer(result.container);
-    renderItems(result.packed_items, result.container);
+    if (result.rows) renderRows(result, result, result.container);
+    else renderItems(result.packed_items, result.container);
 
   } catch(err){ alert('Packing error: '+err.message); }
   finally{ ov.classList.remove('active'); btn.disabled=false; }
@@ -118,43 +118,79 @@ function renderContainer(d) {
   const ws=makeTextSprite(d.width+' cm',lc,28); ws.scale.set(160,40,1); ws.position.set(-50,-30,d.width/2); containerGroup.add(ws);
 }
 
-function renderItems(packed, cd) {
-  const names=[...new Set(packed.map(i=>i.name))];
-  const ncm={}; names.forEach((n,i)=>{ncm[n]=i;});
-
-  packed.forEach(item => {
-    const color = getColor(item.name, ncm[item.name]);
-    const minD = Math.min(item.l, item.h, item.w);
-    const geo = new THREE.BoxGeometry(item.l - 0.5, item.h - 0.5, item.w - 0.5);
-    const mat = new THREE.MeshStandardMaterial({ color, metalness:0.15, roughness:0.75 });
-    const mesh = new THREE.Mesh(geo, mat);
-    mesh.position.set(item.x+item.l/2, item.y+item.h/2, item.z+item.w/2);
-    mesh.castShadow=true; mesh.receiveShadow=true;
-
-    mesh.userData = {
-      name:item.name, origL:item.origL, origH:item.origH, origW:item.origW,
-      weight:item.wt, x:Math.round(item.x), y:Math.round(item.y), z:Math.round(item.z),
-      aggCount:item.aggCnt||1, stackLayer:item.stackLayer, stackMax:item.stackLimit
-    };
-    containerGroup.add(mesh); itemMeshes.push(mesh);
-
-    if(minD > 5) {
-      const opacity = minD > 40 ? 0.25 : (minD > 15 ? 0.18 : 0.1);
-      const el = new THREE.LineSegments(
-        new THREE.EdgesGeometry(geo),
-        new THREE.LineBasicMaterial({color:0x000000,transparent:true,opacity})
-      );
-      el.position.copy(mesh.position);
-      containerGroup.add(el);
-    }
-  });
+function addItemMesh(item, color) {
+  const minD = Math.min(item.l, item.h, item.w);
+  const geo = new THREE.BoxGeometry(item.l - 0.5, item.h - 0.5, item.w - 0.5);
+  const mat = new THREE.MeshStandardMaterial({ color, metalness:0.15, roughness:0.75 });
+  const mesh = new THREE.Mesh(geo, mat);
+  mesh.position.set(item.x+item.l/2, item.y+item.h/2, item.z+item.w/2);
+  mesh.castShadow=true; mesh.receiveShadow=true;
+
+  mesh.userData = {
+    name:item.name, origL:item.origL, origH:item.origH, origW:item.origW,
+    weight:item.wt, x:Math.round(item.x), y:Math.round(item.y), z:Math.round(item.z),
+    aggCount:item.aggCnt||1, stackLayer:item.stackLayer, stackMax:item.stackLimit
+  };
+  containerGroup.add(mesh); itemMeshes.push(mesh);
+
+  if(minD > 5) {
+    const opacity = minD > 40 ? 0.25 : (minD > 15 ? 0.18 : 0.1);
+    const el = new THREE.LineSegments(
+      new THREE.EdgesGeometry(geo),
+      new THREE.LineBasicMaterial({color:0x000000,transparent:true,opacity})
+    );
+    el.position.copy(mesh.position);
+    containerGroup.add(el);
+  }
+}
 
+function finishRender(names, ncm, cd) {
   containerGroup.position.set(-cd.length/2, 0, -cd.width/2);
   updateLegend(names, ncm);
   updateDimLabels(cd);
   autoFitCamera(cd);
 }
 
+function renderItems(packed, cd) {
+  const names=[...new Set(packed.map(i=>i.name))];
+  const ncm={}; names.forEach((n,i)=>{ncm[n]=i;});
+  packed.forEach(item => addItemMesh(item, getColor(item.name, ncm[item.name])));
+  finishRender(names, ncm, cd);
+}
+
+// Incremental rendering for api.packStream(): beginStream() once, streamItem()
+// per placement event, endStream() when the result arrives.
+let streamNames = [], streamNcm = {};
+function beginStream(cd) {
+  clearScene(); renderContainer(cd); autoFitCamera(cd);
+  containerGroup.position.set(-cd.length/2, 0, -cd.width/2);
+  streamNames = []; streamNcm = {};
+}
+function streamItem(item) {
+  if (!(item.name in streamNcm)) { streamNcm[item.name]=streamNames.length; streamNames.push(item.name); }
+  addItemMesh(item, getColor(item.name, streamNcm[item.name]));
+}
+function endStream(cd) { finishRender(streamNames, streamNcm, cd); }
+
+// Float32 rows from api.packCompact(): `plan` is the result (or one fleet entry)
+// holding packed_rows, `res` the response holding rows/row_fields/packed_types.
+function renderRows(res, plan, cd) {
+  const F = {}; res.row_fields.forEach((f,i)=>{F[f]=i;});
+  const stride = res.row_fields.length, rows = res.rows, types = res.packed_types;
+  const start = plan.packed_rows.offset, end = start + plan.packed_rows.count;
+  const names=[], ncm={};
+  for (let r = start; r < end; r++) {
+    const o = r*stride, t = types[rows[o+F.type]];
+    if (!(t.name in ncm)) { ncm[t.name]=names.length; names.push(t.name); }
+    addItemMesh({
+      name:t.name, origL:t.origL, origH:t.origH, origW:t.origW, stackLimit:t.stackLimit,
+      x:rows[o+F.x], y:rows[o+F.y], z:rows[o+F.z], l:rows[o+F.l], h:rows[o+F.h], w:rows[o+F.w],
+      wt:rows[o+F.wt], aggCnt:rows[o+F.aggCnt], stackLayer:rows[o+F.stackLayer]
+    }, getColor(t.name, ncm[t.name]));
+  }
+  finishRender(names, ncm, cd);
+}
+
 function autoFitCamera(d) {
   currentContainerDims = d;
   const maxD = Math.max(d.length, d.height, d.width);
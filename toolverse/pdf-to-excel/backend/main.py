@@ -5,21 +5,27 @@ FastAPI + tabula-py + openpyxl
 
 import os
 import re
+import asyncio
+import mmap
 import time
 import uuid
 import json
 import threading
+import multiprocessing
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
+import numpy as np
 import pandas as pd
 import tabula
 from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import openpyxl
+from pypdf import PdfReader
 
 # ═══════════════════════════════════════════════════
 #  Configuration
@@ -34,6 +40,13 @@ RATE_LIMIT = 3            # max conversions per window
 RATE_WINDOW = 3600        # window = 1 hour (seconds)
 MAX_FILE_SIZE = 100 * 1024 * 1024   # 100 MB
 FILE_TTL = 3600           # auto-delete temp files after 1 hour
+EXTRACT_BATCH = 50        # pages per tabula call (one call per batch and mode)
+EXECUTORS = ("thread", "process")   # run_extraction worker pools
+JOB_WORKERS = 2           # conversions running at once
+JOB_QUEUE_MAX = 20        # queued + running jobs before /api/convert answers 503
+PREVIEW_TABLES = 3        # tables previewed (first 6 rows each), live and in the result
+SSE_POLL = 0.25           # seconds between checks for new job events
+SSE_KEEPALIVE = 15        # seconds between keep-alive comments on an idle stream
 
 # ═══════════════════════════════════════════════════
 #  App Init
@@ -96,9 +109,18 @@ def check_rate_limit(ip: str) -> dict:
         }
 
 
-def record_usage(ip: str):
+def record_usage(ip: str) -> float:
+    ts = time.time()
     with _rate_lock:
-        _rate_log[ip].append(time.time())
+        _rate_log[ip].append(ts)
+    return ts
+
+
+def release_usage(ip: str, ts: float):
+    """Give back a use recorded by record_usage (the conversion it was for failed)."""
+    with _rate_lock:
+        if ts in _rate_log[ip]:
+            _rate_log[ip].remove(ts)
 
 
 # ═══════════════════════════════════════════════════
@@ -106,19 +128,51 @@ def record_usage(ip: str):
 # ═══════════════════════════════════════════════════
 
 def count_pages(pdf_path: str) -> int | None:
+    """
+    Page count from the page tree: pypdf reads the trailer and xref (object streams
+    included) and answers from /Pages /Count. It gets an open file rather than the path,
+    which would make it load the whole upload into memory. Damaged files fall back to
+    counting page objects over an mmap of the file.
+    """
     try:
         with open(pdf_path, "rb") as f:
-            return len(re.findall(rb"/Type\s*/Page(?!s)", f.read()))
+            return len(PdfReader(f).pages) or None
+    except Exception:
+        pass
+    try:
+        with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return len(re.findall(rb"/Type\s*/Page(?!s)", m)) or None
     except Exception:
         return None
 
 
+def resolve_pages(pages: str, total: int | None) -> list[int] | None:
+    """
+    Page numbers for a spec like "all", "1-5" or "1,3,5", in order and without repeats,
+    clipped to the document when its page count is known. None means "all" of a
+    document whose page count could not be read.
+    """
+    if pages.strip().lower() == "all":
+        return list(range(1, total + 1)) if total else None
+    page_list = []
+    for part in str(pages).split(","):
+        p = part.strip()
+        if "-" in p:
+            a, b = p.split("-", 1)
+            page_list.extend(range(int(a), int(b) + 1))
+        elif p:
+            page_list.append(int(p))
+    return [pg for pg in dict.fromkeys(page_list) if pg >= 1 and (not total or pg <= total)]
+
+
+_MODE_KW = {"lattice": {"lattice": True}, "stream": {"stream": True, "guess": True}}
+
+
 def extract_page(pdf_path: str, page: int) -> list[pd.DataFrame]:
     """Extract tables from a single page (lattice → stream fallback)."""
     for mode in ("lattice", "stream"):
         try:
-            kw = {"lattice": True} if mode == "lattice" else {"stream": True, "guess": True}
-            dfs = tabula.read_pdf(pdf_path, pages=str(page), multiple_tables=True, silent=True, **kw)
+            dfs = tabula.read_pdf(pdf_path, pages=str(page), multiple_tables=True, silent=True, **_MODE_KW[mode])
             valid = [d for d in dfs if not d.empty and d.shape[0] > 0]
             if valid:
                 return valid
@@ -127,82 +181,189 @@ def extract_page(pdf_path: str, page: int) -> list[pd.DataFrame]:
     return []
 
 
-def run_extraction(pdf_path: str, pages: str = "all", parallel: bool = True, workers: int = 4) -> tuple[list, dict, list]:
+def _json_table_to_df(table: dict) -> pd.DataFrame:
+    """
+    One table of tabula's JSON output, framed the way read_pdf frames it: first row as header
+    (blank names become "Unnamed: n", repeats get ".1", ".2"...), blanks as NaN, numeric columns
+    converted. This mirrors tabula-py's JSON reader so extract_page() frames look the same,
+    which the header detection in _to_dicts relies on.
+    """
+    rows = [[e["text"] or np.nan for e in row] for row in table.get("data") or ()]
+    if not rows:
+        return pd.DataFrame()
+    columns, unnamed, seen = [], 0, defaultdict(int)
+    for col in rows.pop(0):
+        if col is np.nan:
+            col, unnamed = f"Unnamed: {unnamed}", unnamed + 1
+        while seen[col]:
+            seen[col] += 1
+            col = f"{col}.{seen[col] - 1}"
+        seen[col] += 1
+        columns.append(col)
+    df = pd.DataFrame(rows, columns=columns)
+    for c in df.columns:
+        try:
+            df[c] = pd.to_numeric(df[c], errors="raise")
+        except (ValueError, TypeError):
+            pass
+    return df
+
+
+def _read_batch(pdf_path: str, pages: list[int], mode: str) -> dict[int, list[pd.DataFrame]] | None:
+    """
+    One tabula call for a whole batch of pages; tables grouped by page number.
+    Returns None when the output carries no page numbers (older tabula-java).
+    """
+    raw = tabula.read_pdf(pdf_path, pages=pages, multiple_tables=True, silent=True,
+                          output_format="json", **_MODE_KW[mode])
+    by_page: dict[int, list[pd.DataFrame]] = defaultdict(list)
+    for t in raw:
+        pg = t.get("page_number")
+        if pg is None:
+            return None
+        df = _json_table_to_df(t)
+        if not df.empty:
+            by_page[int(pg)].append(df)
+    return by_page
+
+
+def extract_pages(pdf_path: str, pages: list[int]) -> dict[int, list[pd.DataFrame]]:
+    """
+    Extract tables from a batch of pages: one lattice call for the batch, then one stream
+    call for just the pages lattice found nothing on. With jpype installed tabula-py keeps
+    a single in-process JVM, so a 300-page file costs a few calls instead of up to 600
+    Java round-trips. Falls back to extract_page() per page if a batch call fails.
+    """
+    found: dict[int, list[pd.DataFrame]] = {}
+    todo = list(pages)
+    try:
+        for mode in ("lattice", "stream"):
+            if not todo:
+                break
+            got = _read_batch(pdf_path, todo, mode)
+            if got is None:
+                raise ValueError("no page numbers in tabula output")
+            found.update((pg, got[pg]) for pg in todo if got.get(pg))
+            todo = [pg for pg in todo if pg not in found]
+    except Exception:
+        for pg in todo:
+            tbls = extract_page(pdf_path, pg)
+            if tbls:
+                found[pg] = tbls
+    return found
+
+
+# Process-pool workers (executor="process"): each one is bound to the document once by the
+# pool initializer, and its JVM (jpype) starts on the first batch and serves every later one.
+_worker_pdf: str | None = None
+
+
+def _init_worker(pdf_path: str):
+    global _worker_pdf
+    _worker_pdf = pdf_path
+
+
+def _extract_chunk(pages: list[int]) -> list[tuple[int, list[dict], int]]:
+    """Extract a contiguous page range in a worker: (page, tables as dicts, raw rows), in page order."""
+    found = extract_pages(_worker_pdf, pages)
+    return [(pg, _to_dicts(found[pg]), sum(len(t) for t in found[pg])) for pg in sorted(found)]
+
+
+def run_extraction(pdf_path: str, pages: str = "all", parallel: bool = True, workers: int = 4,
+                   executor: str = "thread", progress: Callable[[dict], None] | None = None) -> tuple[list, dict, list]:
     """
     Main extraction entry point.
+    executor="process" runs the page batches in a process pool (one JVM per worker)
+    instead of threads sharing this process's JVM and GIL.
+    progress, if given, is called with each log entry ({"type": "log", ...}), with each
+    page that has tables ({"type": "page", "page", "tables"}) and after each finished
+    batch ({"type": "progress", "pages_done", "pages_total", "tables", "rows"}).
     Returns (tables_as_dicts, stats, logs)
     """
     t0 = time.time()
     logs = []
+    emit = progress or (lambda event: None)
 
     def log(msg, level="info"):
-        logs.append({"msg": msg, "level": level, "time": datetime.now().strftime("%H:%M:%S")})
+        entry = {"msg": msg, "level": level, "time": datetime.now().strftime("%H:%M:%S")}
+        logs.append(entry)
+        emit({"type": "log", **entry})
 
     fname = os.path.basename(pdf_path)
     log(f"Analyzing {fname}…")
 
     total_pages = count_pages(pdf_path)
-
-    # Determine page list
-    if pages.strip().lower() == "all":
-        if total_pages and total_pages > 0:
-            page_list = list(range(1, total_pages + 1))
-            log(f"Detected {total_pages} pages")
-        else:
-            log("Page count unknown — bulk mode", "warn")
-            tables = []
-            for mode in ("lattice", "stream"):
-                try:
-                    kw = {"lattice": True} if mode == "lattice" else {"stream": True, "guess": True}
-                    dfs = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True, silent=True, **kw)
-                    tables = [d for d in dfs if not d.empty]
-                    if tables:
-                        break
-                except Exception:
-                    pass
-            elapsed = round(time.time() - t0, 2)
-            log(f"Found {len(tables)} tables in {elapsed}s", "ok")
-            return _to_dicts(tables), {"tables": len(tables), "rows": sum(len(t) for t in tables), "time": elapsed, "pages": "?"}, logs
-    else:
-        page_list = []
-        for part in str(pages).split(","):
-            p = part.strip()
-            if "-" in p:
-                a, b = p.split("-", 1)
-                page_list.extend(range(int(a), int(b) + 1))
-            else:
-                page_list.append(int(p))
+    page_list = resolve_pages(pages, total_pages)
+
+    if page_list is None:
+        log("Page count unknown — bulk mode", "warn")
+        tables = []
+        for mode in ("lattice", "stream"):
+            try:
+                dfs = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True, silent=True, **_MODE_KW[mode])
+                tables = [d for d in dfs if not d.empty]
+                if tables:
+                    break
+            except Exception:
+                pass
+        elapsed = round(time.time() - t0, 2)
+        log(f"Found {len(tables)} tables in {elapsed}s", "ok")
+        return _to_dicts(tables), {"tables": len(tables), "rows": sum(len(t) for t in tables), "time": elapsed, "pages": "?"}, logs
+    if total_pages:
+        log(f"Detected {total_pages} pages")
 
     n = len(page_list)
-    log(f"{n} pages · {'parallel' if parallel and n > 2 else 'sequential'} mode")
+    parallel = parallel and n > 2
+    if parallel and executor == "process":
+        workers = max(1, min(workers, os.cpu_count() or 1))
+    log(f"{n} pages · {executor + ' parallel' if parallel else 'sequential'} mode")
 
-    result_map = {}
+    # Contiguous page batches, small enough that every worker gets one
+    size = max(1, min(EXTRACT_BATCH, -(-n // workers))) if parallel else EXTRACT_BATCH
+    batches = [page_list[i:i + size] for i in range(0, n, size)]
 
-    if parallel and n > 2:
+    result_map = {}
+    done = {"pages": 0, "tables": 0, "rows": 0}
+    emit({"type": "progress", "pages_done": 0, "pages_total": n, "tables": 0, "rows": 0})
+
+    def collect(found, batch):
+        for pg, tbls, rows in found:
+            result_map[pg] = (tbls, rows)
+            done["tables"] += len(tbls)
+            done["rows"] += rows
+            log(f"Page {pg}: {len(tbls)} table(s)", "ok")
+            emit({"type": "page", "page": pg, "tables": tbls})
+        done["pages"] += len(batch)
+        emit({"type": "progress", "pages_done": done["pages"], "pages_total": n,
+              "tables": done["tables"], "rows": done["rows"]})
+
+    def local(found):
+        return [(pg, _to_dicts(found[pg]), sum(len(t) for t in found[pg])) for pg in sorted(found)]
+
+    if parallel and executor == "process":
+        # spawn, not fork: a forked child would inherit this process's running JVM
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(pdf_path,)) as pool:
+            for b, found in zip(batches, pool.map(_extract_chunk, batches)):
+                collect(found, b)
+    elif parallel:
         with ThreadPoolExecutor(max_workers=workers) as pool:
-            futs = {pool.submit(extract_page, pdf_path, pg): pg for pg in page_list}
+            futs = {pool.submit(extract_pages, pdf_path, b): b for b in batches}
             for f in as_completed(futs):
-                pg = futs[f]
-                tbls = f.result()
-                if tbls:
-                    result_map[pg] = tbls
-                    log(f"Page {pg}: {len(tbls)} table(s)", "ok")
+                collect(local(f.result()), futs[f])
     else:
-        for pg in page_list:
-            tbls = extract_page(pdf_path, pg)
-            if tbls:
-                result_map[pg] = tbls
-                log(f"Page {pg}: {len(tbls)} table(s)", "ok")
+        for b in batches:
+            collect(local(extract_pages(pdf_path, b)), b)
 
     all_tables = []
     for pg in sorted(result_map):
-        all_tables.extend(result_map[pg])
+        all_tables.extend(result_map[pg][0])
 
     elapsed = round(time.time() - t0, 2)
-    stats = {"tables": len(all_tables), "rows": sum(len(t) for t in all_tables), "time": elapsed, "pages": n}
+    stats = {"tables": len(all_tables), "rows": sum(r[1] for r in result_map.values()), "time": elapsed, "pages": n}
     log(f"Done — {len(all_tables)} tables, {stats['rows']} rows in {elapsed}s", "ok")
 
-    return _to_dicts(all_tables), stats, logs
+    return all_tables, stats, logs
 
 
 def _to_dicts(tables: list[pd.DataFrame]) -> list[dict]:
@@ -286,7 +447,7 @@ def generate_excel(tables: list[dict], output_path: str):
 # ═══════════════════════════════════════════════════
 
 def cleanup_old_files():
-    """Remove temp files older than FILE_TTL seconds."""
+    """Remove temp files and finished jobs older than FILE_TTL seconds."""
     now = time.time()
     for d in (UPLOAD_DIR, OUTPUT_DIR):
         for f in d.iterdir():
@@ -295,6 +456,10 @@ def cleanup_old_files():
                     f.unlink()
                 except Exception:
                     pass
+    with _jobs_lock:
+        for job_id in [k for k, j in _jobs.items()
+                       if j["status"] in ("done", "failed") and now - j["created"] > FILE_TTL]:
+            del _jobs[job_id]
 
 def _start_cleanup_timer():
     cleanup_old_files()
@@ -302,7 +467,96 @@ def _start_cleanup_timer():
     t.daemon = True
     t.start()
 
-_start_cleanup_timer()
+
+# ═══════════════════════════════════════════════════
+#  Conversion Jobs (background, bounded concurrency)
+# ═══════════════════════════════════════════════════
+
+_jobs_lock = threading.Lock()
+_jobs: dict[str, dict] = {}
+_job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="convert")
+
+
+def _previews(tables: list[dict], first_id: int = 1) -> list[dict]:
+    return [{"id": first_id + i, "cols": t["cols"], "rows": t["rows"][:6], "total_rows": t["total_rows"]}
+            for i, t in enumerate(tables)]
+
+
+def _update_job(job_id: str, event: str | None = None, data: dict | None = None, **fields):
+    """Update a job record; event/data also appends to the log its SSE stream replays."""
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job.update(fields)
+        if event:
+            job["events"].append((event, data))
+
+
+def _job_progress(job_id: str) -> Callable[[dict], None]:
+    """run_extraction progress hook: mirrors logs and page counts into the job record and its event log."""
+    def progress(event: dict):
+        kind = event["type"]
+        with _jobs_lock:
+            job = _jobs[job_id]
+            if kind == "log":
+                entry = {k: event[k] for k in ("msg", "level", "time")}
+                job["logs"].append(entry)
+                job["events"].append(("log", entry))
+            elif kind == "page":
+                # pages can finish out of order; these are early looks, the result has the final previews
+                room = PREVIEW_TABLES - job["previewed"]
+                if room > 0:
+                    tables = _previews(event["tables"][:room], job["previewed"] + 1)
+                    job["previewed"] += len(tables)
+                    job["events"].append(("preview", {"page": event["page"], "tables": tables}))
+            else:
+                counts = {k: event[k] for k in ("pages_done", "pages_total", "tables", "rows")}
+                job.update(counts)
+                job["events"].append(("progress", counts))
+    return progress
+
+
+def _run_job(job_id: str, pdf_path: Path, ip: str, used_at: float, opts: dict):
+    """Extract + build the workbook for one queued upload, off the event loop."""
+    _update_job(job_id, "status", {"status": "running"}, status="running")
+    try:
+        tables, stats, logs = run_extraction(str(pdf_path), progress=_job_progress(job_id), **opts)
+    except Exception as e:
+        release_usage(ip, used_at)
+        error = f"Extraction failed: {str(e)}"
+        _update_job(job_id, "error", {"error": error}, status="failed", error=error)
+        return
+    finally:
+        pdf_path.unlink(missing_ok=True)
+
+    # ── Generate Excel ──
+    download_token = None
+    if tables:
+        xlsx_path = OUTPUT_DIR / f"{job_id}.xlsx"
+        try:
+            generate_excel(tables, str(xlsx_path))
+            download_token = job_id
+        except Exception as e:
+            logs.append({"msg": f"Excel generation error: {e}", "level": "err", "time": datetime.now().strftime("%H:%M:%S")})
+
+    previews = _previews(tables[:PREVIEW_TABLES])
+
+    updated_status = check_rate_limit(ip)
+    result = {
+        "stats": stats,
+        "logs": logs,
+        "previews": previews,
+        "extra_count": max(0, len(tables) - PREVIEW_TABLES),
+        "download_token": download_token,
+        "rate": {
+            "remaining": updated_status.get("remaining", 0),
+            "limit": RATE_LIMIT,
+        },
+    }
+    _update_job(job_id, "done", result, status="done", result=result)
+
+
+if multiprocessing.parent_process() is None:   # not in extraction pool workers
+    _start_cleanup_timer()
 
 
 # ═══════════════════════════════════════════════════
@@ -329,9 +583,12 @@ async def convert_pdf(
     pages: str = Form("all"),
     parallel: bool = Form(True),
     workers: int = Form(4),
+    executor: str = Form("thread"),
 ):
     """
-    Upload a PDF, extract tables, return preview + download token.
+    Upload a PDF and queue its conversion; returns a job id right away (202).
+    Poll /api/jobs/{job_id} (or follow /api/jobs/{job_id}/events) for progress,
+    previews and the download token.
     Rate limited: 3 per hour per IP.
     """
     ip = _get_client_ip(request)
@@ -351,6 +608,8 @@ async def convert_pdf(
         )
 
     # ── Validate file ──
+    if executor not in EXECUTORS:
+        raise HTTPException(status_code=400, detail=f"executor must be one of: {', '.join(EXECUTORS)}.")
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
 
@@ -358,58 +617,35 @@ async def convert_pdf(
     if len(content) > MAX_FILE_SIZE:
         raise HTTPException(status_code=400, detail=f"File too large. Max {MAX_FILE_SIZE // (1024*1024)} MB.")
 
+    # ── Queue capacity ──
+    with _jobs_lock:
+        active = sum(j["status"] in ("queued", "running") for j in _jobs.values())
+    if active >= JOB_QUEUE_MAX:
+        raise HTTPException(status_code=503, detail="Server busy, please try again in a minute.")
+
     # ── Save temp file ──
     task_id = uuid.uuid4().hex[:12]
     pdf_path = UPLOAD_DIR / f"{task_id}.pdf"
     pdf_path.write_bytes(content)
 
-    # ── Extract ──
-    try:
-        tables, stats, logs = run_extraction(
-            str(pdf_path),
-            pages=pages,
-            parallel=parallel,
-            workers=min(workers, 8),
-        )
-    except Exception as e:
-        pdf_path.unlink(missing_ok=True)
-        raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
-
-    # ── Generate Excel ──
-    download_token = None
-    if tables:
-        xlsx_path = OUTPUT_DIR / f"{task_id}.xlsx"
-        try:
-            generate_excel(tables, str(xlsx_path))
-            download_token = task_id
-        except Exception as e:
-            logs.append({"msg": f"Excel generation error: {e}", "level": "err", "time": datetime.now().strftime("%H:%M:%S")})
-
-    # ── Record usage (only on success) ──
-    record_usage(ip)
-
-    # ── Build preview data ──
-    previews = []
-    for i, tbl in enumerate(tables[:3]):
-        previews.append({
-            "id": i + 1,
-            "cols": tbl["cols"],
-            "rows": tbl["rows"][:6],
-            "total_rows": tbl["total_rows"],
-        })
+    # ── Queue the job (counted now; given back if extraction fails) ──
+    used_at = record_usage(ip)
+    with _jobs_lock:
+        _jobs[task_id] = {
+            "job_id": task_id, "status": "queued", "created": time.time(),
+            "pages_done": 0, "pages_total": None, "tables": 0, "rows": 0,
+            "logs": [], "result": None, "error": None,
+            "events": [("status", {"status": "queued"})], "previewed": 0,
+        }
+    _job_pool.submit(_run_job, task_id, pdf_path, ip, used_at,
+                     dict(pages=pages, parallel=parallel, workers=min(workers, 8), executor=executor))
 
-    # ── Rate info for response ──
     updated_status = check_rate_limit(ip)
-
-    # ── Cleanup uploaded PDF ──
-    pdf_path.unlink(missing_ok=True)
-
-    return JSONResponse(content={
-        "stats": stats,
-        "logs": logs,
-        "previews": previews,
-        "extra_count": max(0, len(tables) - 3),
-        "download_token": download_token,
+    return JSONResponse(status_code=202, content={
+        "job_id": task_id,
+        "status": "queued",
+        "status_url": f"/api/jobs/{task_id}",
+        "events_url": f"/api/jobs/{task_id}/events",
         "rate": {
             "remaining": updated_status.get("remaining", 0),
             "limit": RATE_LIMIT,
@@ -417,6 +653,60 @@ async def convert_pdf(
     })
 
 
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Progress of a conversion job; the full result (previews, download token) once done."""
+    if not re.match(r'^[a-f0-9]{12}$', job_id):
+        raise HTTPException(status_code=400, detail="Invalid job id.")
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found or expired.")
+        body = {k: v for k, v in job.items() if k not in ("created", "result", "events", "previewed")}
+        body["logs"] = list(job["logs"])
+        if job["result"]:
+            body.update(job["result"])
+    return JSONResponse(content=body)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-sent events for a job, replayed from the start (or after Last-Event-ID):
+    status, log, progress, preview, and finally done (the full result) or error.
+    """
+    if not re.match(r'^[a-f0-9]{12}$', job_id):
+        raise HTTPException(status_code=400, detail="Invalid job id.")
+    with _jobs_lock:
+        if job_id not in _jobs:
+            raise HTTPException(status_code=404, detail="Job not found or expired.")
+    last = request.headers.get("Last-Event-ID", "")
+    start = int(last) + 1 if last.isdigit() else 0
+
+    async def stream():
+        i, idle = start, 0.0
+        while True:
+            with _jobs_lock:
+                job = _jobs.get(job_id)
+                if job is None:
+                    return
+                new = job["events"][i:]
+                finished = job["status"] in ("done", "failed")
+            for name, data in new:
+                yield f"id: {i}\nevent: {name}\ndata: {json.dumps(data)}\n\n"
+                i += 1
+            if finished or await request.is_disconnected():
+                return
+            idle = 0.0 if new else idle + SSE_POLL
+            if idle >= SSE_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(SSE_POLL)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.get("/api/download/{token}")
 async def download_file(token: str):
     """Download the generated Excel file by token."""